@@ -1,8 +1,8 @@
 from django.contrib import admin
-from django.core.mail import send_mail
 from django.utils.crypto import get_random_string
 from django.contrib.auth.hashers import make_password
-from .models import TreasurerAccount
+from .models import TreasurerAccount, OutboxEmail
+from .outbox import queue_mail
 
 @admin.register(TreasurerAccount)
 class TreasurerAdmin(admin.ModelAdmin):
@@ -30,7 +30,7 @@ class TreasurerAdmin(admin.ModelAdmin):
 
         # Send email only when creating new Treasurer
         if temp_password and not change:
-            send_mail(
+            queue_mail(
                 subject="Welcome to FeeTracker!",
                 message=(
                     f"Hi,\n"
@@ -40,7 +40,11 @@ class TreasurerAdmin(admin.ModelAdmin):
                     f"Please log in and set a new password as soon as possible.\n"
                     f"Thanks,\nThe FeeTracker Team"
                 ),
-                from_email="noreply@feetracker.com",
-                recipient_list=[obj.email],
-                fail_silently=False
-            )
\ No newline at end of file
+                recipient=obj.email
+            )
+
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = ('to_email', 'subject', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter = ('status',)
+    readonly_fields = ('created_at', 'sent_at', 'claimed_at', 'last_error')
@@ -1,8 +1,17 @@
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from django.apps import apps
+from django.conf import settings
 from rest_framework.permissions import BasePermission
 from rest_framework_simplejwt.authentication import JWTAuthentication
 
 class AuthlessUser:
     is_authenticated = True
+
+# Stateless: one instance serves every request
+AUTHLESS_USER = AuthlessUser()
     
 class IsStudent(BasePermission):
     def has_permission(self, request, view):
@@ -16,9 +25,61 @@ class IsAdmin(BasePermission):
     def has_permission(self, request, view):
         return request.auth and request.auth.get("role") == "admin"
 
+# Per-process LRU of already verified tokens keyed by a digest of the raw
+# token. An entry is only served until the token's own "exp", so the cache
+# never accepts a token the signature check would reject.
+class VerifiedTokenCache:
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, digest):
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None or entry[0] <= time.time():
+                if entry is not None:
+                    del self._entries[digest]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(digest)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, digest, validated_token):
+        expires_at = validated_token.get('exp')
+        if not expires_at or self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[digest] = (expires_at, validated_token)
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0
+            }
+
+verified_tokens = VerifiedTokenCache(getattr(settings, 'JWT_VERIFY_CACHE_SIZE', 10000))
+
 class CustomJWTAuthentication(JWTAuthentication):
     def get_user(self, validated_token):
-        return AuthlessUser()
+        return AUTHLESS_USER
 
     def authenticate(self, request):
         header = self.get_header(request)
@@ -27,5 +88,18 @@ class CustomJWTAuthentication(JWTAuthentication):
         raw_token = self.get_raw_token(header)
         if raw_token is None:
             return None
-        validated_token = self.get_validated_token(raw_token)
-        return (AuthlessUser(), validated_token)
\ No newline at end of file
+        return (AUTHLESS_USER, self.get_cached_validated_token(raw_token))
+
+    def get_cached_validated_token(self, raw_token):
+        if verified_tokens.max_entries <= 0:
+            return self.get_validated_token(raw_token)
+
+        digest = hashlib.sha256(raw_token).digest()
+        validated_token = verified_tokens.get(digest)
+        if validated_token is None:
+            validated_token = self.get_validated_token(raw_token)
+            # Token types checked against the blacklist are re-verified every time
+            # so a revocation is seen immediately
+            if not (hasattr(validated_token, 'check_blacklist') and apps.is_installed('rest_framework_simplejwt.token_blacklist')):
+                verified_tokens.set(digest, validated_token)
+        return validated_token
@@ -0,0 +1,59 @@
+import time
+import random
+import contextvars
+from contextlib import contextmanager
+from django.conf import settings
+from django.db import connections, DatabaseError, DEFAULT_DB_ALIAS
+
+# Sends reads to a "replica*" alias while ReplicaRoutingMiddleware has enabled
+# it for the current request; everything else (and every write) uses the
+# primary. A replica that cannot be reached is skipped for
+# REPLICA_RETRY_SECONDS and reads fall back to the next one or the primary.
+
+_replica_reads = contextvars.ContextVar('replica_reads', default=False)
+_down_until = {}
+
+def replica_aliases():
+    return [alias for alias in settings.DATABASES if alias.startswith('replica')]
+
+def enable_replica_reads(enabled=True):
+    _replica_reads.set(enabled)
+
+# Reads inside the block go to the primary even during a replica-read request
+@contextmanager
+def primary_reads():
+    token = _replica_reads.set(False)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+def _available(alias):
+    if _down_until.get(alias, 0) > time.monotonic():
+        return False
+    try:
+        connections[alias].ensure_connection()
+    except DatabaseError:
+        _down_until[alias] = time.monotonic() + getattr(settings, 'REPLICA_RETRY_SECONDS', 30)
+        return False
+    return True
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if not _replica_reads.get():
+            return DEFAULT_DB_ALIAS
+        aliases = replica_aliases()
+        random.shuffle(aliases)
+        for alias in aliases:
+            if _available(alias):
+                return alias
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
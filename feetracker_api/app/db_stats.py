@@ -0,0 +1,74 @@
+import os
+import threading
+import contextvars
+from django.core.signals import request_started, request_finished
+from django.db.backends.signals import connection_created
+
+# Per-worker counters showing how often a request reused an open database
+# connection instead of opening a new one (see DB_CONN_MAX_AGE). Each request
+# records whether it ran a query and how many connections it opened; only
+# requests that queried count towards reuse, and connections opened outside
+# a request (background threads, management work) are counted separately.
+
+_lock = threading.Lock()
+_counts = {
+    'requests': 0,
+    'requests_with_queries': 0,
+    'connections_opened': 0,
+    'connections_reused': 0,
+    'background_connections_opened': 0
+}
+_request = contextvars.ContextVar('db_stats_request', default=None)
+
+def _count(name, amount=1):
+    with _lock:
+        _counts[name] += amount
+
+def _on_request_started(sender, **kwargs):
+    _request.set({'queried': False, 'opened': 0})
+
+def _on_request_finished(sender, **kwargs):
+    state = _request.get()
+    if state is None:
+        return
+    _request.set(None)
+
+    with _lock:
+        _counts['requests'] += 1
+        _counts['connections_opened'] += state['opened']
+        if state['queried']:
+            _counts['requests_with_queries'] += 1
+            if not state['opened']:
+                _counts['connections_reused'] += 1
+
+def _mark_queried(execute, sql, params, many, context):
+    state = _request.get()
+    if state is not None:
+        state['queried'] = True
+    return execute(sql, params, many, context)
+
+def _on_connection_created(sender, connection, **kwargs):
+    # The wrapper stays on this DatabaseWrapper across reconnects
+    if _mark_queried not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_mark_queried)
+
+    state = _request.get()
+    if state is None:
+        _count('background_connections_opened')
+    else:
+        state['opened'] += 1
+
+def connect_signals():
+    request_started.connect(_on_request_started, dispatch_uid='db_stats_request_started')
+    request_finished.connect(_on_request_finished, dispatch_uid='db_stats_request_finished')
+    connection_created.connect(_on_connection_created, dispatch_uid='db_stats_connection_created')
+
+def stats():
+    with _lock:
+        counts = dict(_counts)
+    with_queries = counts['requests_with_queries']
+    return {
+        "pid": os.getpid(),
+        **counts,
+        "reuse_ratio": round(counts['connections_reused'] / with_queries, 4) if with_queries else 0
+    }
@@ -0,0 +1,66 @@
+import json
+import hashlib
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+from . import versions
+from .payload_cache import student_payloads
+
+# Conditional GET for the student endpoints.
+# The response's data_hash is sent as the ETag. The last hash computed for a
+# (view, student, version, query) is remembered in the cache, so a client that
+# already holds it gets a 304 after a single version lookup. Unchanged payloads
+# are also served from the per-process LRU without being rebuilt.
+
+def _query_hash(query_params, response_format):
+    # The negotiated format is part of the key: the same query can be asked
+    # for as JSON or compact through the Accept header
+    query = json.dumps([response_format, sorted(query_params.items())])
+    return hashlib.sha256(query.encode()).hexdigest()
+
+def _matches(request, data_hash):
+    header = request.headers.get('If-None-Match')
+    if not header:
+        return False
+    tags = [tag[2:] if tag.startswith('W/') else tag for tag in parse_etags(header)]
+    return '*' in tags or f'"{data_hash}"' in tags
+
+def _not_modified(data_hash):
+    response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    response['ETag'] = f'"{data_hash}"'
+    patch_vary_headers(response, ['Accept'])
+    return response
+
+def conditional_response(request, view_name, student_id, build):
+    version = versions.get_version(student_id)
+    renderer = getattr(request, 'accepted_renderer', None)
+    query_hash = _query_hash(request.query_params.dict(), getattr(renderer, 'format', None))
+    key = f"etag:{view_name}:{student_id}:{version}:{query_hash}"
+
+    known_hash = cache.get(key)
+    if known_hash and _matches(request, known_hash):
+        return _not_modified(known_hash)
+
+    payload_key = (view_name, student_id, query_hash)
+    data = student_payloads.get(payload_key, version)
+    if data is not None:
+        response = Response(data, status=status.HTTP_200_OK)
+    else:
+        response = build()
+
+    data_hash = response.data.get('data_hash') if response.status_code == status.HTTP_200_OK and isinstance(response.data, dict) else None
+    if not data_hash:
+        return response
+
+    if data is None:
+        student_payloads.set(payload_key, version, response.data)
+        cache.set(key, data_hash, getattr(settings, 'ETAG_CACHE_TIMEOUT', 3600))
+    if _matches(request, data_hash):
+        return _not_modified(data_hash)
+
+    response['ETag'] = f'"{data_hash}"'
+    patch_vary_headers(response, ['Accept'])
+    return response
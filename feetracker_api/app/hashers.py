@@ -0,0 +1,106 @@
+import os
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password, PBKDF2PasswordHasher, Argon2PasswordHasher
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+# Hashers whose cost comes from settings (PASSWORD_HASHER_POLICY picks which
+# one is preferred). Changing a cost makes existing hashes "need update", and
+# verify_password() rehashes them on the next successful login.
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    time_cost = getattr(settings, 'ARGON2_TIME_COST', Argon2PasswordHasher.time_cost)
+    memory_cost = getattr(settings, 'ARGON2_MEMORY_COST', Argon2PasswordHasher.memory_cost)
+    parallelism = getattr(settings, 'ARGON2_PARALLELISM', Argon2PasswordHasher.parallelism)
+
+class TunedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    iterations = getattr(settings, 'PBKDF2_ITERATIONS', PBKDF2PasswordHasher.iterations)
+
+class HashingBusy(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Server is busy, please try again shortly."
+    default_code = 'hashing_busy'
+
+# All request-path hashing runs on a small shared pool so a login burst
+# cannot take every CPU from the rest of the API. Callers block on the
+# result; once HASHING_MAX_PENDING calls are already waiting, new ones are
+# refused with 503 instead of queueing without bound.
+class HashingPool:
+    def __init__(self, workers, max_pending):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = None
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(workers + max_pending)
+
+    def call(self, func, *args):
+        if not self._slots.acquire(blocking=False):
+            raise HashingBusy()
+        try:
+            return self._get_executor().submit(func, *args).result()
+        finally:
+            self._slots.release()
+
+    # Bulk callers (roster import) keep at most `workers` calls in flight and
+    # wait on their own oldest call for a slot; with none in flight and the
+    # pool full they are refused like any other caller.
+    def map(self, func, items):
+        results = []
+        in_flight = deque()
+
+        def finish_oldest():
+            future = in_flight.popleft()
+            try:
+                results.append(future.result())
+            finally:
+                self._slots.release()
+
+        try:
+            for item in items:
+                while len(in_flight) >= self.workers or not self._slots.acquire(blocking=False):
+                    if not in_flight:
+                        raise HashingBusy()
+                    finish_oldest()
+                in_flight.append(self._get_executor().submit(func, item))
+            while in_flight:
+                finish_oldest()
+        finally:
+            # On error, let calls already running finish before freeing their slots
+            for future in in_flight:
+                future.cancel()
+                wait([future])
+                self._slots.release()
+        return results
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='hashing')
+            return self._executor
+
+hashing_pool = HashingPool(
+    getattr(settings, 'HASHING_WORKERS', None) or max(1, (os.cpu_count() or 2) // 2),
+    getattr(settings, 'HASHING_MAX_PENDING', 32)
+)
+
+def hash_password(raw_password):
+    return hashing_pool.call(make_password, raw_password)
+
+def password_matches(raw_password, encoded):
+    return hashing_pool.call(check_password, raw_password, encoded)
+
+def verify_password(account, raw_password):
+    needs_upgrade = []
+    valid = hashing_pool.call(check_password, raw_password, account.password, needs_upgrade.append)
+
+    if valid and needs_upgrade:
+        try:
+            account.password = hash_password(raw_password)
+        except HashingBusy:
+            # Upgrade on a later login instead of failing this one
+            return valid
+        account.save(update_fields=['password'])
+    return valid
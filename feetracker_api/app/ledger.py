@@ -0,0 +1,226 @@
+from decimal import Decimal
+from django.db import transaction, IntegrityError
+from django.db.models import Sum, Count, F, Q, Value, Exists, OuterRef, Subquery, CharField, DecimalField
+from django.db.models.functions import Coalesce
+from . import report_cache, versions
+from .models import StudentRecord, StudentPaymentHistory, StudentTermBalance
+
+# Running (student_id, semester, school_year) -> total_paid ledger.
+# Callers must apply changes inside the same transaction as the payment write.
+
+def term_key(student_id, semester, school_year):
+    return {'student_id': str(student_id), 'semester': str(semester), 'school_year': str(school_year)}
+
+def apply_payment(student_id, semester, school_year, amount, count=1):
+    key = term_key(student_id, semester, school_year)
+    updated = StudentTermBalance.objects.filter(**key).update(
+        total_paid=F('total_paid') + amount,
+        payment_count=F('payment_count') + count
+    )
+    if updated:
+        return
+
+    try:
+        with transaction.atomic():
+            StudentTermBalance.objects.create(**key, total_paid=amount, payment_count=count)
+    except IntegrityError:
+        # Another writer created the row first
+        StudentTermBalance.objects.filter(**key).update(
+            total_paid=F('total_paid') + amount,
+            payment_count=F('payment_count') + count
+        )
+
+# Locks the student's term row until the surrounding transaction ends, so the
+# cap check and the payment insert cannot interleave with another writer.
+def lock_term(student_id, semester, school_year):
+    if not transaction.get_connection().in_atomic_block:
+        raise transaction.TransactionManagementError("lock_term() must be called inside transaction.atomic().")
+
+    key = term_key(student_id, semester, school_year)
+    StudentTermBalance.objects.get_or_create(**key)
+    return StudentTermBalance.objects.select_for_update().get(**key)
+
+# Locks several term rows at once (in a fixed order to avoid deadlocks) and
+# maps every requested (student_id, semester, school_year) to its row. Keys
+# the database collation treats as equal (e.g. case under MySQL) share one
+# row instance.
+def lock_terms(keys):
+    if not transaction.get_connection().in_atomic_block:
+        raise transaction.TransactionManagementError("lock_terms() must be called inside transaction.atomic().")
+
+    keys = {tuple(term_key(*key).values()) for key in keys}
+    if not keys:
+        return {}
+
+    StudentTermBalance.objects.bulk_create(
+        [StudentTermBalance(student_id=student_id, semester=semester, school_year=school_year) for student_id, semester, school_year in keys],
+        ignore_conflicts=True
+    )
+
+    condition = Q()
+    for student_id, semester, school_year in keys:
+        condition |= Q(student_id=student_id, semester=semester, school_year=school_year)
+
+    rows = StudentTermBalance.objects.select_for_update().filter(condition).order_by('student_id', 'school_year', 'semester')
+    by_key = {(row.student_id, row.semester, row.school_year): row for row in rows}
+    by_pk = {row.pk: row for row in by_key.values()}
+
+    locked = {}
+    for key in keys:
+        row = by_key.get(key)
+        if row is None:
+            # Stored under a spelling that only the collation considers equal
+            row = by_pk[StudentTermBalance.objects.values_list('pk', flat=True).get(**term_key(*key))]
+        locked[key] = row
+    return locked
+
+def revert_payment(student_id, semester, school_year, amount):
+    apply_payment(student_id, semester, school_year, -amount, count=-1)
+
+def balances(student_id=None, semester=None, school_year=None):
+    queryset = StudentTermBalance.objects.filter(payment_count__gt=0)
+    if student_id:
+        queryset = queryset.filter(student_id=student_id)
+    if semester:
+        queryset = queryset.filter(semester=semester)
+    if school_year:
+        queryset = queryset.filter(school_year=school_year)
+    return queryset
+
+# Every student's total for one term as three disjoint querysets with the
+# same (sid, name, paid) columns, so each can be filtered, ordered and paged
+# on its own indexes instead of sorting a union of the whole roster:
+#   payers:          ledger rows with a positive total (balance_term_paid_idx)
+#   unpaid_students: roster students without a positive ledger row (paid 0)
+#   unpaid_orphans:  ledger rows with payments but neither a positive total
+#                    nor a StudentRecord
+# Name search is a prefix match so it can use student_name_idx.
+def term_roster(semester, school_year, search=None):
+    key = {'semester': str(semester), 'school_year': str(school_year)}
+    money = DecimalField(max_digits=10, decimal_places=2)
+    term_rows = StudentTermBalance.objects.filter(**key)
+    record_name = StudentRecord.objects.filter(student_id=OuterRef('student_id')).values('full_name')[:1]
+
+    payers = term_rows.filter(total_paid__gt=0).annotate(
+        sid=F('student_id'),
+        name=Coalesce(Subquery(record_name), Value(''), output_field=CharField()),
+        paid=F('total_paid')
+    )
+    unpaid_students = StudentRecord.objects.exclude(
+        Exists(term_rows.filter(student_id=OuterRef('student_id'), total_paid__gt=0))
+    ).annotate(
+        sid=F('student_id'),
+        name=F('full_name'),
+        paid=Value(Decimal('0.00'), output_field=money)
+    )
+    unpaid_orphans = term_rows.filter(payment_count__gt=0, total_paid__lte=0).exclude(
+        Exists(StudentRecord.objects.filter(student_id=OuterRef('student_id')))
+    ).annotate(
+        sid=F('student_id'),
+        name=Value('', output_field=CharField()),
+        paid=F('total_paid')
+    )
+
+    if search:
+        payers = payers.filter(Q(student_id__istartswith=search) | Q(name__istartswith=search))
+        unpaid_students = unpaid_students.filter(Q(student_id__istartswith=search) | Q(full_name__istartswith=search))
+        unpaid_orphans = unpaid_orphans.filter(student_id__istartswith=search)
+    return payers, unpaid_students, unpaid_orphans
+
+# Most recent term with payments, optionally within one semester or school year
+def latest_term(semester=None, school_year=None):
+    queryset = StudentTermBalance.objects.filter(payment_count__gt=0)
+    if semester:
+        queryset = queryset.filter(semester=str(semester))
+    if school_year:
+        queryset = queryset.filter(school_year=str(school_year))
+    return queryset.order_by('-school_year', '-semester').values_list('semester', 'school_year').first()
+
+def get_total_paid(student_id, semester=None, school_year=None):
+    if semester and school_year:
+        total = StudentTermBalance.objects.filter(
+            **term_key(student_id, semester, school_year)
+        ).values_list('total_paid', flat=True).first()
+    else:
+        total = balances(student_id, semester, school_year).aggregate(total=Sum('total_paid'))['total']
+    return total or Decimal("0.00")
+
+def compute_from_history():
+    rows = (
+        StudentPaymentHistory.objects
+        .values('student_id', 'semester', 'school_year')
+        .annotate(total_paid=Sum('amount_paid'), payment_count=Count('receipt_id'))
+    )
+    return {
+        (row['student_id'], row['semester'], row['school_year']): (row['total_paid'], row['payment_count'])
+        for row in rows.iterator()
+    }
+
+# Blocks payment writers for the rest of the rebuild transaction, so the
+# totals computed from history cannot miss a payment committed meanwhile.
+# MySQL table locks outlive the transaction; the caller releases them.
+def _lock_tables(connection):
+    history = connection.ops.quote_name(StudentPaymentHistory._meta.db_table)
+    balances = connection.ops.quote_name(StudentTermBalance._meta.db_table)
+    with connection.cursor() as cursor:
+        if connection.vendor == 'mysql':
+            cursor.execute(f"LOCK TABLES {history} READ, {balances} WRITE")
+            return True
+        if connection.vendor == 'postgresql':
+            cursor.execute(f"LOCK TABLE {history}, {balances} IN SHARE ROW EXCLUSIVE MODE")
+        # SQLite takes the database write lock; a writer that committed after
+        # our reads makes the rebuild fail instead of saving stale totals
+    return False
+
+def rebuild(batch_size=1000):
+    connection = transaction.get_connection()
+    table_locks = False
+    try:
+        with transaction.atomic():
+            table_locks = _lock_tables(connection)
+            current = _ledger_totals()
+            expected = compute_from_history()
+            _replace_ledger(expected, batch_size)
+            # Student payload and ETag caches are keyed by these versions
+            versions.bump_many(
+                key[0] for key in current.keys() | expected.keys() if current.get(key) != expected.get(key)
+            )
+    finally:
+        if table_locks:
+            with connection.cursor() as cursor:
+                cursor.execute("UNLOCK TABLES")
+
+    report_cache.invalidate_all()
+    return len(expected)
+
+def _replace_ledger(expected, batch_size):
+    StudentTermBalance.objects.all().delete()
+    StudentTermBalance.objects.bulk_create(
+        (
+            StudentTermBalance(
+                student_id=student_id,
+                semester=semester,
+                school_year=school_year,
+                total_paid=total_paid,
+                payment_count=payment_count
+            )
+            for (student_id, semester, school_year), (total_paid, payment_count) in expected.items()
+        ),
+        batch_size=batch_size
+    )
+
+def _ledger_totals():
+    return {
+        (row.student_id, row.semester, row.school_year): (row.total_paid, row.payment_count)
+        for row in StudentTermBalance.objects.iterator()
+    }
+
+def verify():
+    expected = compute_from_history()
+    actual = {key: totals for key, totals in _ledger_totals().items() if any(totals)}
+
+    mismatches = []
+    for key in expected.keys() | actual.keys():
+        if expected.get(key) != actual.get(key):
+            mismatches.append((key, expected.get(key), actual.get(key)))
+    return sorted(mismatches)
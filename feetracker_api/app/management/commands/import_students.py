@@ -0,0 +1,33 @@
+from pathlib import Path
+from django.core.management.base import BaseCommand, CommandError
+from app import roster
+
+class Command(BaseCommand):
+    help = "Create verified student accounts from a CSV or JSON lines roster."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=['csv', 'jsonl'], default=None, help="Defaults to the file extension.")
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        if not path.exists():
+            raise CommandError(f"File not found: {path}")
+
+        fmt = options['format'] or ('csv' if path.suffix.lower() == '.csv' else 'jsonl')
+        try:
+            rows = roster.parse_roster(path.read_bytes(), fmt)
+        except ValueError as e:
+            raise CommandError(f"Could not read roster: {e}")
+
+        result = roster.import_roster(
+            rows,
+            batch_size=options['batch_size'],
+            hash_passwords=roster.hash_passwords_in_processes
+        )
+        for error in result['errors']:
+            self.stdout.write(f"Row {error['row']} ({error['student_id']}): {error['errors']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{result['created']} created, {result['updated']} updated, {len(result['errors'])} rejected."
+        ))
@@ -0,0 +1,25 @@
+import time
+from django.core.management.base import BaseCommand
+from app import report_jobs
+
+class Command(BaseCommand):
+    help = "Render queued treasurer PDF reports. Runs until stopped unless --once is given."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Drain the queue once and exit.")
+        parser.add_argument('--interval', type=float, default=2.0, help="Seconds to wait when the queue is empty.")
+        parser.add_argument('--purge', action='store_true', help="Delete jobs and files older than REPORT_JOB_TTL first.")
+
+    def handle(self, *args, **options):
+        if options['purge']:
+            purged = report_jobs.purge_expired()
+            self.stdout.write(f"Purged {purged} expired report job(s).")
+
+        while True:
+            processed = report_jobs.run_pending_jobs()
+            if processed:
+                self.stdout.write(f"Processed {processed} report job(s).")
+            if options['once']:
+                break
+            if not processed:
+                time.sleep(options['interval'])
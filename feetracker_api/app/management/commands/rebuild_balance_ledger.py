@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+from app import ledger
+
+class Command(BaseCommand):
+    help = "Rebuild the per-student, per-term balance ledger from payment history, or verify it."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verify', action='store_true', help="Only compare the ledger with payment history.")
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if options['verify']:
+            mismatches = ledger.verify()
+            for (student_id, semester, school_year), expected, actual in mismatches:
+                self.stdout.write(
+                    f"{student_id} semester {semester} {school_year}: expected {expected}, ledger has {actual}"
+                )
+            if mismatches:
+                raise CommandError(f"{len(mismatches)} ledger row(s) out of sync.")
+            self.stdout.write(self.style.SUCCESS("Balance ledger matches payment history."))
+            return
+
+        count = ledger.rebuild(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt balance ledger with {count} row(s)."))
@@ -0,0 +1,25 @@
+import time
+from django.core.management.base import BaseCommand
+from app import outbox
+
+class Command(BaseCommand):
+    help = "Deliver queued outbox emails. Runs until stopped unless --once is given."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Drain due emails once and exit.")
+        parser.add_argument('--batch-size', type=int, default=None)
+        parser.add_argument('--interval', type=float, default=2.0, help="Seconds to wait when nothing is due.")
+
+    def handle(self, *args, **options):
+        while True:
+            sent = 0
+            while True:
+                batch = outbox.send_pending(options['batch_size'])
+                if not batch:
+                    break
+                sent += batch
+            if sent:
+                self.stdout.write(f"Processed {sent} outbox email(s).")
+            if options['once']:
+                break
+            time.sleep(options['interval'])
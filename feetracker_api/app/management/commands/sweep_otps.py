@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from app import otp
+
+class Command(BaseCommand):
+    help = "Delete expired one-time codes in bounded batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        deleted = otp.sweep_expired(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired code(s)."))
@@ -0,0 +1,40 @@
+import hashlib
+from django.conf import settings
+from django.core.cache import cache
+from .db_router import replica_aliases, enable_replica_reads
+
+# Lets GET requests to views with replica_reads = True read from a replica.
+# A client that just made a successful write (identified by its Authorization
+# header, or IP when anonymous) is pinned to the primary for
+# REPLICA_PIN_SECONDS so it reads its own writes.
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+def _client_key(request):
+    client = request.META.get('HTTP_AUTHORIZATION') or request.META.get('REMOTE_ADDR', '')
+    return "replica_pin:" + hashlib.sha256(client.encode()).hexdigest()
+
+class ReplicaRoutingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            response = self.get_response(request)
+        finally:
+            enable_replica_reads(False)
+
+        if request.method not in SAFE_METHODS and response.status_code < 400 and replica_aliases():
+            cache.set(_client_key(request), True, getattr(settings, 'REPLICA_PIN_SECONDS', 10))
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, 'cls', None) or getattr(view_func, 'view_class', None)
+        if (
+            request.method in ('GET', 'HEAD')
+            and getattr(view_class, 'replica_reads', False)
+            and replica_aliases()
+            and not cache.get(_client_key(request))
+        ):
+            enable_replica_reads()
+        return None
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0004_studentpaymenthistory_added_by'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReceiptSequence',
+            fields=[
+                ('name', models.CharField(max_length=20, primary_key=True, serialize=False)),
+                ('next_number', models.BigIntegerField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ReleasedReceipt',
+            fields=[
+                ('number', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('released_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:41
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def populate_balances(apps, schema_editor):
+    StudentPaymentHistory = apps.get_model('app', 'StudentPaymentHistory')
+    StudentTermBalance = apps.get_model('app', 'StudentTermBalance')
+
+    rows = (
+        StudentPaymentHistory.objects
+        .values('student_id', 'semester', 'school_year')
+        .annotate(total_paid=Sum('amount_paid'), payment_count=Count('receipt_id'))
+    )
+    StudentTermBalance.objects.bulk_create(
+        (StudentTermBalance(**row) for row in rows.iterator()),
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0005_receipt_allocator'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentTermBalance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('student_id', models.CharField(max_length=20)),
+                ('semester', models.CharField(max_length=10)),
+                ('school_year', models.CharField(max_length=9)),
+                ('total_paid', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('payment_count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('student_id', 'school_year', 'semester'), name='unique_student_term_balance')],
+            },
+        ),
+        migrations.RunPython(populate_balances, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0006_student_term_balance'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='studentpaymenthistory',
+            index=models.Index(fields=['student_id', 'school_year', 'semester'], name='payment_student_term_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studentpaymenthistory',
+            index=models.Index(fields=['payment_date'], name='payment_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studentpaymenthistory',
+            index=models.Index(fields=['school_year', 'semester', 'student_id'], name='payment_term_student_idx'),
+        ),
+    ]
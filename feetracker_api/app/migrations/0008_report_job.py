@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:45
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0007_payment_history_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('filters_key', models.CharField(db_index=True, max_length=64)),
+                ('semester', models.CharField(blank=True, max_length=10, null=True)),
+                ('school_year', models.CharField(blank=True, max_length=9, null=True)),
+                ('start_date', models.CharField(blank=True, max_length=32, null=True)),
+                ('end_date', models.CharField(blank=True, max_length=32, null=True)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], db_index=True, default='pending', max_length=10)),
+                ('file', models.FileField(blank=True, null=True, upload_to='reports/')),
+                ('error', models.TextField(blank=True, null=True)),
+                ('requested_by', models.CharField(blank=True, max_length=50, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0009_outbox_email'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentDataVersion',
+            fields=[
+                ('student_id', models.CharField(max_length=20, primary_key=True, serialize=False)),
+                ('version', models.BigIntegerField(default=0)),
+            ],
+        ),
+    ]
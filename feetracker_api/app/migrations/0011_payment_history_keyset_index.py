@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0010_student_data_version'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='studentpaymenthistory',
+            index=models.Index(fields=['student_id', 'payment_date', 'receipt_id'], name='payment_student_date_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0011_payment_history_keyset_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='studentrecord',
+            index=models.Index(fields=['full_name', 'student_id'], name='student_name_idx'),
+        ),
+    ]
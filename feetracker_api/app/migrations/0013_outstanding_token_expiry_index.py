@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:55
+
+from django.db import migrations, models
+
+# simplejwt's OutstandingToken.expires_at has no index; prune_tokens deletes
+# by it. The model belongs to another app, so the index is created directly.
+
+INDEX = models.Index(fields=['expires_at'], name='outstanding_token_exp_idx')
+
+
+def add_index(apps, schema_editor):
+    OutstandingToken = apps.get_model('token_blacklist', 'OutstandingToken')
+    schema_editor.add_index(OutstandingToken, INDEX)
+
+
+def remove_index(apps, schema_editor):
+    OutstandingToken = apps.get_model('token_blacklist', 'OutstandingToken')
+    schema_editor.remove_index(OutstandingToken, INDEX)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0012_student_record_name_index'),
+        ('token_blacklist', '0013_alter_blacklistedtoken_options_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_index, remove_index),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:57
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0013_outstanding_token_expiry_index'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='studentaccount',
+            name='otp_code',
+        ),
+        migrations.RemoveField(
+            model_name='studentaccount',
+            name='otp_expiry',
+        ),
+        migrations.CreateModel(
+            name='StudentOtp',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('student_id', models.CharField(max_length=20)),
+                ('purpose', models.CharField(choices=[('verify', 'Account verification'), ('reset', 'Password reset')], max_length=10)),
+                ('code_hash', models.CharField(max_length=64)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('expires_at', models.DateTimeField()),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['expires_at'], name='otp_expiry_idx')],
+                'constraints': [models.UniqueConstraint(fields=('student_id', 'purpose'), name='unique_student_otp_purpose')],
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0014_student_otp'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='studenttermbalance',
+            index=models.Index(fields=['school_year', 'semester', 'student_id'], name='balance_term_student_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studenttermbalance',
+            index=models.Index(fields=['school_year', 'semester', 'total_paid', 'student_id'], name='balance_term_paid_idx'),
+        ),
+    ]
@@ -1,4 +1,6 @@
+import uuid
 from django.db import models
+from django.utils import timezone
 
 class StudentRecord(models.Model):
     student_id = models.CharField(max_length=20, primary_key=True)
@@ -11,12 +13,15 @@ class StudentRecord(models.Model):
     birthdate = models.DateField(blank=True, null=True)
     address = models.TextField(blank=True, null=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['full_name', 'student_id'], name='student_name_idx'),
+        ]
+
 class StudentAccount(models.Model):
     student = models.OneToOneField(StudentRecord, on_delete=models.CASCADE, primary_key=True)
     password = models.CharField(max_length=128)
     is_verified = models.BooleanField(default=False)
-    otp_code = models.CharField(max_length=6, null=True, blank=True)
-    otp_expiry = models.DateTimeField(null=True, blank=True)
 
 class StudentPaymentHistory(models.Model):
     receipt_id = models.CharField(primary_key=True, max_length=20)
@@ -27,6 +32,18 @@ class StudentPaymentHistory(models.Model):
     payment_date = models.DateTimeField(auto_now_add=True)
     added_by = models.CharField(max_length=50, null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            # Balance checks: one student's payments for a term
+            models.Index(fields=['student_id', 'school_year', 'semester'], name='payment_student_term_idx'),
+            # Per-student history pages ordered by (payment_date, receipt_id)
+            models.Index(fields=['student_id', 'payment_date', 'receipt_id'], name='payment_student_date_idx'),
+            # Recent-payments feeds and report date ranges
+            models.Index(fields=['payment_date'], name='payment_date_idx'),
+            # Report grouping per term
+            models.Index(fields=['school_year', 'semester', 'student_id'], name='payment_term_student_idx'),
+        ]
+
 class TreasurerAccount(models.Model):
     username = models.CharField(max_length=50, unique=True)
     password = models.CharField(max_length=128)
@@ -37,4 +54,114 @@ class AdminAccount(models.Model):
     username = models.CharField(max_length=50, unique=True)
     password = models.CharField(max_length=128)
     email = models.EmailField(unique=True)
-    must_change_password = models.BooleanField(default=False)
\ No newline at end of file
+    must_change_password = models.BooleanField(default=False)
+
+class ReceiptSequence(models.Model):
+    name = models.CharField(max_length=20, primary_key=True)
+    next_number = models.BigIntegerField()
+
+class ReleasedReceipt(models.Model):
+    number = models.BigIntegerField(primary_key=True)
+    released_at = models.DateTimeField(auto_now_add=True)
+
+class StudentTermBalance(models.Model):
+    student_id = models.CharField(max_length=20)
+    semester = models.CharField(max_length=10)
+    school_year = models.CharField(max_length=9)
+    total_paid = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    payment_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['student_id', 'school_year', 'semester'], name='unique_student_term_balance'),
+        ]
+        indexes = [
+            # Balance browser: one term's payers by ID, and by amount / status
+            models.Index(fields=['school_year', 'semester', 'student_id'], name='balance_term_student_idx'),
+            models.Index(fields=['school_year', 'semester', 'total_paid', 'student_id'], name='balance_term_paid_idx'),
+        ]
+
+
+class ReportJob(models.Model):
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    filters_key = models.CharField(max_length=64, db_index=True)
+    semester = models.CharField(max_length=10, null=True, blank=True)
+    school_year = models.CharField(max_length=9, null=True, blank=True)
+    start_date = models.CharField(max_length=32, null=True, blank=True)
+    end_date = models.CharField(max_length=32, null=True, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING, db_index=True)
+    file = models.FileField(upload_to='reports/', null=True, blank=True)
+    error = models.TextField(null=True, blank=True)
+    requested_by = models.CharField(max_length=50, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+class OutboxEmail(models.Model):
+    PENDING = 'pending'
+    SENDING = 'sending'
+    SENT = 'sent'
+    DEAD = 'dead'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (SENDING, 'Sending'),
+        (SENT, 'Sent'),
+        (DEAD, 'Dead'),
+    ]
+
+    subject = models.CharField(max_length=255)
+    message = models.TextField()
+    from_email = models.CharField(max_length=254)
+    to_email = models.EmailField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_due_idx'),
+        ]
+
+class StudentDataVersion(models.Model):
+    student_id = models.CharField(max_length=20, primary_key=True)
+    version = models.BigIntegerField(default=0)
+
+# One active code per (student, purpose); the code itself is only stored as
+# an HMAC. Rows are consumed on success and swept once expired.
+class StudentOtp(models.Model):
+    VERIFY = 'verify'
+    RESET = 'reset'
+    PURPOSE_CHOICES = [
+        (VERIFY, 'Account verification'),
+        (RESET, 'Password reset'),
+    ]
+
+    student_id = models.CharField(max_length=20)
+    purpose = models.CharField(max_length=10, choices=PURPOSE_CHOICES)
+    code_hash = models.CharField(max_length=64)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    expires_at = models.DateTimeField()
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['student_id', 'purpose'], name='unique_student_otp_purpose'),
+        ]
+        indexes = [
+            models.Index(fields=['expires_at'], name='otp_expiry_idx'),
+        ]
@@ -0,0 +1,85 @@
+import secrets
+from datetime import timedelta
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+from django.utils.crypto import salted_hmac
+from .models import StudentOtp
+
+# One-time codes for account verification and password reset. Codes are kept
+# as an HMAC tied to the student and purpose. Every check first counts an
+# attempt with a conditional UPDATE; a correct, unexpired code is then
+# consumed by a single conditional DELETE, and only failed attempts read the
+# row again to report why they failed.
+
+VALID = 'valid'
+MISSING = 'missing'
+EXPIRED = 'expired'
+INVALID = 'invalid'
+LOCKED = 'locked'
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+def hash_code(student_id, purpose, code):
+    return salted_hmac(f"otp:{purpose}", f"{student_id}:{code}", algorithm="sha256").hexdigest()
+
+def issue(student_id, purpose):
+    code = f"{secrets.randbelow(900000) + 100000}"
+    StudentOtp.objects.update_or_create(
+        student_id=student_id,
+        purpose=purpose,
+        defaults={
+            'code_hash': hash_code(student_id, purpose, code),
+            'attempts': 0,
+            'expires_at': timezone.now() + timedelta(minutes=_setting('OTP_TTL_MINUTES', 10)),
+            'created_at': timezone.now()
+        }
+    )
+    return code
+
+def consume(student_id, purpose, code):
+    current_time = timezone.now()
+    max_attempts = _setting('OTP_MAX_ATTEMPTS', 5)
+    active = StudentOtp.objects.filter(student_id=student_id, purpose=purpose)
+
+    # Reserve an attempt before comparing the code, so concurrent guesses
+    # cannot get past the limit together
+    reserved = active.filter(expires_at__gt=current_time, attempts__lt=max_attempts).update(attempts=F('attempts') + 1)
+    if reserved:
+        consumed, _ = active.filter(code_hash=hash_code(student_id, purpose, code), expires_at__gt=current_time).delete()
+        if consumed:
+            return VALID
+
+    otp = active.only('expires_at', 'attempts').first()
+    if otp is None:
+        return MISSING
+    if otp.expires_at <= current_time:
+        otp.delete()
+        return EXPIRED
+    if otp.attempts >= max_attempts:
+        otp.delete()
+        return LOCKED
+    return INVALID
+
+def discard(student_id, purpose):
+    StudentOtp.objects.filter(student_id=student_id, purpose=purpose).delete()
+
+def discard_many(student_ids, purpose, chunk_size=1000):
+    student_ids = list(student_ids)
+    for start in range(0, len(student_ids), chunk_size):
+        StudentOtp.objects.filter(student_id__in=student_ids[start:start + chunk_size], purpose=purpose).delete()
+
+def sweep_expired(batch_size=1000):
+    current_time = timezone.now()
+    deleted = 0
+    while True:
+        ids = list(
+            StudentOtp.objects.filter(expires_at__lte=current_time)
+            .order_by('expires_at')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            return deleted
+        StudentOtp.objects.filter(id__in=ids).delete()
+        deleted += len(ids)
@@ -0,0 +1,155 @@
+import logging
+import threading
+from datetime import timedelta
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction, close_old_connections
+from django.db.models import Q
+from django.utils import timezone
+from .models import OutboxEmail
+
+logger = logging.getLogger(__name__)
+
+# Outgoing mail is written to OutboxEmail and sent after the request commits.
+# Senders claim due rows in batches, deliver them over one SMTP connection and
+# retry failures with exponential backoff until OUTBOX_MAX_ATTEMPTS, after
+# which the row is left in the dead state for inspection. The in-process
+# sender runs after each queued mail commits and, while retries are waiting,
+# once more when the earliest of them is due.
+
+DEFAULT_FROM_EMAIL = "noreply@feetracker.com"
+
+_executor = None
+_executor_lock = threading.Lock()
+_retry_timer = None
+_retry_at = None
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+def queue_mail(subject, message, recipient, from_email=DEFAULT_FROM_EMAIL):
+    email = OutboxEmail.objects.create(
+        subject=subject,
+        message=message,
+        from_email=from_email,
+        to_email=recipient
+    )
+    if _setting('OUTBOX_SEND_IN_PROCESS', True):
+        transaction.on_commit(_submit_in_process)
+    return email
+
+def _submit_in_process():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='outbox')
+    _executor.submit(_run_in_thread)
+
+def _run_in_thread():
+    close_old_connections()
+    try:
+        while send_pending():
+            pass
+        schedule_retry()
+    finally:
+        close_old_connections()
+
+# Keeps one timer, set for the earliest pending retry
+def schedule_retry():
+    global _retry_timer, _retry_at
+    next_attempt_at = (
+        OutboxEmail.objects.filter(status=OutboxEmail.PENDING)
+        .order_by('next_attempt_at')
+        .values_list('next_attempt_at', flat=True)
+        .first()
+    )
+    if next_attempt_at is None:
+        return
+
+    with _executor_lock:
+        if _retry_timer is not None and _retry_at <= next_attempt_at:
+            return
+        if _retry_timer is not None:
+            _retry_timer.cancel()
+        delay = max((next_attempt_at - timezone.now()).total_seconds(), 0)
+        _retry_timer = threading.Timer(delay, _retry_due)
+        _retry_timer.daemon = True
+        _retry_at = next_attempt_at
+        _retry_timer.start()
+
+def _retry_due():
+    global _retry_timer, _retry_at
+    with _executor_lock:
+        _retry_timer = _retry_at = None
+    _submit_in_process()
+
+def claim_batch(batch_size):
+    current_time = timezone.now()
+    # Rows stuck in "sending" belong to a sender that died mid-batch
+    stale_before = current_time - timedelta(seconds=_setting('OUTBOX_CLAIM_TIMEOUT', 600))
+
+    with transaction.atomic():
+        batch = list(
+            OutboxEmail.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(status=OutboxEmail.PENDING, next_attempt_at__lte=current_time)
+                | Q(status=OutboxEmail.SENDING, claimed_at__lt=stale_before)
+            )
+            .order_by('next_attempt_at')[:batch_size]
+        )
+        if batch:
+            OutboxEmail.objects.filter(pk__in=[email.pk for email in batch]).update(
+                status=OutboxEmail.SENDING,
+                claimed_at=current_time
+            )
+    return batch
+
+def send_pending(batch_size=None):
+    batch = claim_batch(batch_size or _setting('OUTBOX_BATCH_SIZE', 50))
+    if not batch:
+        return 0
+
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as exc:
+        logger.warning("Could not open mail connection: %s", exc)
+        for email in batch:
+            _mark_failed(email, exc)
+        return len(batch)
+
+    try:
+        for email in batch:
+            try:
+                EmailMessage(
+                    subject=email.subject,
+                    body=email.message,
+                    from_email=email.from_email,
+                    to=[email.to_email],
+                    connection=connection
+                ).send()
+            except Exception as exc:
+                logger.warning("Sending outbox email %s failed: %s", email.pk, exc)
+                _mark_failed(email, exc)
+            else:
+                email.status = OutboxEmail.SENT
+                email.attempts += 1
+                email.sent_at = timezone.now()
+                email.last_error = None
+                email.save(update_fields=['status', 'attempts', 'sent_at', 'last_error'])
+    finally:
+        connection.close()
+
+    return len(batch)
+
+def _mark_failed(email, exc):
+    email.attempts += 1
+    email.last_error = str(exc)
+    if email.attempts >= _setting('OUTBOX_MAX_ATTEMPTS', 5):
+        email.status = OutboxEmail.DEAD
+    else:
+        delay = _setting('OUTBOX_RETRY_DELAY', 30) * (2 ** (email.attempts - 1))
+        email.status = OutboxEmail.PENDING
+        email.next_attempt_at = timezone.now() + timedelta(seconds=delay)
+    email.save(update_fields=['status', 'attempts', 'last_error', 'next_attempt_at'])
@@ -0,0 +1,32 @@
+import json
+import base64
+from django.conf import settings
+
+# Opaque keyset cursors: the sort key of the last row on a page, JSON-encoded
+# and base64url-wrapped so clients treat it as a token.
+
+class InvalidCursor(ValueError):
+    pass
+
+def encode_cursor(values):
+    raw = json.dumps(values, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_cursor(cursor, size):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError):
+        raise InvalidCursor("Invalid cursor.")
+    if not isinstance(values, list) or len(values) != size:
+        raise InvalidCursor("Invalid cursor.")
+    return values
+
+def page_size(request, default=None, maximum=None):
+    default = default or getattr(settings, 'PAGE_SIZE_DEFAULT', 50)
+    maximum = maximum or getattr(settings, 'PAGE_SIZE_MAX', 200)
+    try:
+        size = int(request.query_params.get('limit', default))
+    except ValueError:
+        return default
+    return max(1, min(size, maximum))
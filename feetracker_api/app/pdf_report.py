@@ -1,14 +1,81 @@
-from io import BytesIO
+import tempfile
 from reportlab.lib.pagesizes import A4
 from reportlab.lib import colors
 from reportlab.lib.colors import HexColor
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
 from reportlab.lib.styles import getSampleStyleSheet
-from django.http import HttpResponse
-
-def generate_treasurer_report_pdf(summary_data, payment_data, semester, school_year, start_date, end_date, filename="treasurer_report.pdf"):
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=20, leftMargin=20, topMargin=20, bottomMargin=20)
+from django.http import FileResponse
+
+# Payment rows per table chunk (about one A4 page)
+PAYMENT_ROWS_PER_CHUNK = 35
+
+PAYMENT_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), HexColor("#1F618D")),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('GRID', (0, 0), (-1, -1), 0.3, HexColor("#B3B6B7")),
+    ('ROWBACKGROUNDS', (0,1), (-1,-1), [HexColor("#F8F9F9"), HexColor("#EBF5FB")]),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('TOPPADDING', (0,0), (-1,-1), 6),
+    ('BOTTOMPADDING', (0,0), (-1,-1), 6),
+])
+
+# Document that tops up its (plain) flowable list from an iterator through
+# the afterFlowable hook, so only a few payment table chunks exist at a time.
+#
+# Memory still grows with the page count: reportlab keeps every finished
+# page's content stream (about 8 KB, i.e. PAYMENT_ROWS_PER_CHUNK rows) until
+# the file is written. Roughly 0.5 KB per payment row, ~20 MB per 40k rows;
+# see benchmarks/pdf_memory.py. Very large exports should narrow the filters.
+class _StreamingDocTemplate(SimpleDocTemplate):
+    buffered = 4
+
+    def build_streaming(self, head, tail):
+        self._flowables = list(head)
+        self._tail = iter(tail)
+        self._fill()
+        self.build(self._flowables)
+
+    def afterFlowable(self, flowable):
+        self._fill()
+
+    def _fill(self):
+        while self._tail is not None and len(self._flowables) < self.buffered:
+            try:
+                self._flowables.append(next(self._tail))
+            except StopIteration:
+                self._tail = None
+
+def _format_amount(amount_value):
+    # Ensure it's formatted with peso sign and commas (if numeric)
+    try:
+        return f"P{float(amount_value):,.2f}"
+    except:
+        return f"P{amount_value}"
+
+def _payment_tables(payment_rows, col_widths):
+    header = ["Student ID", "Payment Date", "Amount Paid"]
+    chunk = [header]
+    for student_id, payment_date, amount_paid in payment_rows:
+        chunk.append([student_id, payment_date, _format_amount(amount_paid)])
+        if len(chunk) > PAYMENT_ROWS_PER_CHUNK:
+            yield _payment_table(chunk, col_widths)
+            chunk = [header]
+    if len(chunk) > 1:
+        yield _payment_table(chunk, col_widths)
+
+def _payment_table(rows, col_widths):
+    table = Table(rows, colWidths=col_widths, hAlign='CENTER', repeatRows=1)
+    table.setStyle(PAYMENT_TABLE_STYLE)
+    return table
+
+def report_filename(semester, school_year, start_date, end_date):
+    return f"treasurer_report_{semester}_{school_year}_{start_date}_to_{end_date}.pdf".replace(" ", "_")
+
+# Render the report into a writable binary file object.
+# payment_rows is any iterable of (student_id, payment_date_str, amount_paid).
+def build_treasurer_report_pdf(output, summary_data, payment_rows, semester, school_year, start_date, end_date):
+    doc = _StreamingDocTemplate(output, pagesize=A4, rightMargin=20, leftMargin=20, topMargin=20, bottomMargin=20)
     elements = []
     styles = getSampleStyleSheet()
 
@@ -73,40 +140,18 @@ def generate_treasurer_report_pdf(summary_data, payment_data, semester, school_y
     # Payment details table
     elements.append(Paragraph("Payment Details", styles['Heading2']))
 
-    # Keep only Student ID, Payment Date, Amount Paid
-    filtered_payment_data = [["Student ID", "Payment Date", "Amount Paid"]]  # header row
-    for row in payment_data[1:]:  # skip original header
-        amount_value = row[2]
-        # Ensure it's formatted with peso sign and commas (if numeric)
-        try:
-            amount_value = f"P{float(amount_value):,.2f}"
-        except:
-            amount_value = f"P{amount_value}"
-        filtered_payment_data.append([row[0], row[1], amount_value])
-
-    num_cols = len(filtered_payment_data[0])
+    # Payment table streamed in page-sized chunks with repeating headers
+    num_cols = 3
     col_widths_payment = [table_width / num_cols] * num_cols
-    t_payments = Table(filtered_payment_data, colWidths=col_widths_payment, hAlign='CENTER')
-
-    t_payments.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor("#1F618D")),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('GRID', (0, 0), (-1, -1), 0.3, HexColor("#B3B6B7")),
-        ('ROWBACKGROUNDS', (0,1), (-1,-1), [HexColor("#F8F9F9"), HexColor("#EBF5FB")]),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('TOPPADDING', (0,0), (-1,-1), 6),
-        ('BOTTOMPADDING', (0,0), (-1,-1), 6),
-    ]))
-    elements.append(t_payments)
 
-    # Build PDF
-    doc.build(elements)
-    buffer.seek(0)
+    doc.build_streaming(elements, _payment_tables(payment_rows, col_widths_payment))
 
-    # Dynamic filename
-    filename = f"treasurer_report_{semester}_{school_year}_{start_date}_to_{end_date}.pdf".replace(" ", "_")
+def generate_treasurer_report_pdf(summary_data, payment_rows, semester, school_year, start_date, end_date):
+    # Rendered into an anonymous temp file instead of memory; closed (and removed) by FileResponse
+    output = tempfile.TemporaryFile()
+    build_treasurer_report_pdf(output, summary_data, payment_rows, semester, school_year, start_date, end_date)
+    output.seek(0)
 
-    response = HttpResponse(buffer, content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
-    return response
\ No newline at end of file
+    response = FileResponse(output, content_type='application/pdf')
+    response['Content-Disposition'] = f'attachment; filename="{report_filename(semester, school_year, start_date, end_date)}"'
+    return response
@@ -0,0 +1,122 @@
+import threading
+from collections import deque
+from django.conf import settings
+from django.db import transaction
+from .models import StudentPaymentHistory, ReceiptSequence, ReleasedReceipt
+
+RECEIPT_PREFIX = "CTUG"
+RECEIPT_FLOOR = 100
+
+def format_receipt_id(number):
+    return f"{RECEIPT_PREFIX}{number}"
+
+def parse_receipt_number(receipt_id):
+    if not receipt_id or not receipt_id.startswith(RECEIPT_PREFIX):
+        return None
+    try:
+        return int(receipt_id[len(RECEIPT_PREFIX):])
+    except ValueError:
+        return None
+
+# Highest numeric receipt already stored (compared as numbers, not strings)
+def get_last_receipt_number():
+    last_number = RECEIPT_FLOOR
+    receipt_ids = StudentPaymentHistory.objects.filter(
+        receipt_id__startswith=RECEIPT_PREFIX
+    ).values_list('receipt_id', flat=True)
+
+    for receipt_id in receipt_ids.iterator():
+        number = parse_receipt_number(receipt_id)
+        if number is not None and number > last_number:
+            last_number = number
+    return last_number
+
+# Receipt ID allocator shared by every worker through the database.
+# Each process reserves a block of numbers (hi/lo) and hands them out from
+# memory; released numbers are kept in ReleasedReceipt and reclaimed first
+# whenever a process refills its block. Numbers held by a process that dies
+# are skipped, never issued twice.
+#
+# A block reserved inside a caller's transaction rewinds if that transaction
+# rolls back, so its spare numbers only join the local pool once it commits;
+# otherwise another worker could reserve and issue them again. Views take the
+# ID before opening their transaction and give_back() it if nothing is saved.
+class ReceiptAllocator:
+    def __init__(self, name="receipt", block_size=None):
+        self.name = name
+        self.block_size = block_size or getattr(settings, 'RECEIPT_BLOCK_SIZE', 20)
+        self._lock = threading.Lock()
+        self._numbers = deque()
+
+    def next_receipt_id(self):
+        with self._lock:
+            if self._numbers:
+                return format_receipt_id(self._numbers.popleft())
+
+            numbers = list(self._reserve_block())
+            if transaction.get_connection().in_atomic_block:
+                transaction.on_commit(lambda: self._add_numbers(numbers[1:]))
+            else:
+                self._numbers.extend(numbers[1:])
+        return format_receipt_id(numbers[0])
+
+    # Contiguous run of fresh numbers straight from the shared sequence (bulk posting)
+    def reserve_contiguous(self, count):
+        with transaction.atomic():
+            sequence = self._lock_sequence()
+            start = sequence.next_number
+            sequence.next_number = start + count
+            sequence.save(update_fields=['next_number'])
+        return [format_receipt_id(number) for number in range(start, start + count)]
+
+    # Returns an unused ID to this process. Only outside atomic(), where its
+    # block reservation is known to be committed.
+    def give_back(self, receipt_id):
+        number = parse_receipt_number(receipt_id)
+        if number is None or transaction.get_connection().in_atomic_block:
+            return
+        with self._lock:
+            self._numbers.appendleft(number)
+
+    def _add_numbers(self, numbers):
+        with self._lock:
+            self._numbers.extend(numbers)
+
+    def release(self, receipt_id):
+        number = parse_receipt_number(receipt_id)
+        if number is None:
+            return
+        ReleasedReceipt.objects.get_or_create(number=number)
+
+    def reset(self):
+        with self._lock:
+            self._numbers.clear()
+
+    def _reserve_block(self):
+        with transaction.atomic():
+            released = list(
+                ReleasedReceipt.objects.select_for_update(skip_locked=True)
+                .order_by('number')
+                .values_list('number', flat=True)[:self.block_size]
+            )
+            if released:
+                ReleasedReceipt.objects.filter(number__in=released).delete()
+                return released
+
+            sequence = self._lock_sequence()
+            start = sequence.next_number
+            sequence.next_number = start + self.block_size
+            sequence.save(update_fields=['next_number'])
+            return range(start, start + self.block_size)
+
+    def _lock_sequence(self):
+        try:
+            return ReceiptSequence.objects.select_for_update().get(name=self.name)
+        except ReceiptSequence.DoesNotExist:
+            ReceiptSequence.objects.get_or_create(
+                name=self.name,
+                defaults={'next_number': get_last_receipt_number() + 1}
+            )
+            return ReceiptSequence.objects.select_for_update().get(name=self.name)
+
+receipt_allocator = ReceiptAllocator()
@@ -0,0 +1,46 @@
+import json
+import hashlib
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework.renderers import BaseRenderer
+
+# Opt-in compact format for the student payment endpoints (?format=compact or
+# Accept: application/vnd.feetracker.compact+json). Rows are sent as columnar
+# arrays of raw values; the client does the formatting. The data part is
+# serialized once and data_hash is the SHA-256 of exactly those bytes, so
+# everything the client renders belongs in data; extras (paging state such
+# as next_cursor) are left out of the hash and the ETag.
+
+def _dumps(value):
+    return json.dumps(value, cls=DjangoJSONEncoder, separators=(',', ':'), ensure_ascii=False)
+
+# Dict view of the payload (for data_hash lookups and caching) carrying the
+# already rendered body
+class CompactPayload(dict):
+    body = b''
+
+def compact_payload(data, **extra):
+    data_bytes = _dumps(data).encode()
+    data_hash = hashlib.sha256(data_bytes).hexdigest()
+
+    payload = CompactPayload(extra, data_hash=data_hash)
+    head = _dumps({**extra, 'data_hash': data_hash})[:-1].encode()
+    payload.body = head + b',"data":' + data_bytes + b'}'
+    return payload
+
+def columns(names, rows):
+    rows = list(rows)
+    values = list(zip(*rows)) if rows else [()] * len(names)
+    return {name: list(column) for name, column in zip(names, values)}
+
+class CompactJSONRenderer(BaseRenderer):
+    media_type = 'application/vnd.feetracker.compact+json'
+    format = 'compact'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if isinstance(data, CompactPayload):
+            return data.body
+        # Errors and other plain responses
+        return _dumps(data).encode()
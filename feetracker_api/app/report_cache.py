@@ -0,0 +1,82 @@
+import json
+import time
+import hashlib
+from django.conf import settings
+from django.core.cache import cache
+from .db_router import primary_reads
+
+# Treasurer report summaries cached per filter set.
+# Every (semester, school_year) scope has a version stamp; a payment write bumps
+# the stamps of the four scopes it can appear in, so only reports whose filters
+# match the written term are invalidated. A global generation stamp, bumped
+# by invalidate_all(), retires every scope at once (e.g. after a ledger rebuild).
+# Misses are computed on the primary: the stamps are bumped as soon as a write
+# commits, and a lagging replica would otherwise cache pre-write figures under
+# the new version for every client, including the one that just wrote.
+
+GENERATION_KEY = "report:generation"
+
+def _timeout():
+    return getattr(settings, 'REPORT_CACHE_TIMEOUT', 300)
+
+def _normalize(value):
+    return str(value) if value else "*"
+
+def _version_key(semester, school_year):
+    return f"report:version:{_normalize(semester)}:{_normalize(school_year)}"
+
+def _get_version(semester, school_year):
+    key = _version_key(semester, school_year)
+    version = cache.get(key)
+    if version is None:
+        # Seed with a clock value so an evicted stamp never reuses an old version
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+def _bump(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, time.time_ns(), timeout=None)
+
+def _count(name):
+    key = f"report:stats:{name}"
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+
+def invalidate_all():
+    _bump(GENERATION_KEY)
+
+def invalidate_term(semester, school_year):
+    for scope in ((semester, school_year), (semester, None), (None, school_year), (None, None)):
+        _bump(_version_key(*scope))
+
+def get_summary(semester, school_year, start_date, end_date, compute):
+    version = f"{cache.get(GENERATION_KEY, 0)}.{_get_version(semester, school_year)}"
+    filters = json.dumps([_normalize(semester), _normalize(school_year), _normalize(start_date), _normalize(end_date)])
+    key = f"report:summary:{hashlib.sha256(filters.encode()).hexdigest()}:{version}"
+
+    summary = cache.get(key)
+    if summary is not None:
+        _count("hits")
+        return summary
+
+    _count("misses")
+    with primary_reads():
+        summary = compute()
+    cache.set(key, summary, _timeout())
+    return summary
+
+def stats():
+    hits = cache.get("report:stats:hits", 0)
+    misses = cache.get("report:stats:misses", 0)
+    lookups = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": round(hits / lookups, 4) if lookups else 0
+    }
@@ -0,0 +1,147 @@
+import json
+import hashlib
+import logging
+import tempfile
+import threading
+from datetime import timedelta
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core.files import File
+from django.db import router, transaction, close_old_connections
+from django.db.models import Q
+from django.utils import timezone
+from .models import ReportJob
+from .pdf_report import build_treasurer_report_pdf, report_filename
+from . import reports
+
+logger = logging.getLogger(__name__)
+
+# Background PDF report jobs.
+# Jobs are rows in ReportJob, claimed with select_for_update(skip_locked=True) so
+# any number of workers (the process_report_jobs command or the in-process
+# executor) can drain the same queue. A job left running longer than
+# REPORT_JOB_RUN_TIMEOUT belongs to a worker that died; it is claimed again,
+# no longer shared by new requests and can be purged once expired.
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def _ttl():
+    return timedelta(seconds=getattr(settings, 'REPORT_JOB_TTL', 600))
+
+def _stale_before():
+    return timezone.now() - timedelta(seconds=getattr(settings, 'REPORT_JOB_RUN_TIMEOUT', 900))
+
+def filters_key(semester, school_year, start_date, end_date):
+    filters = json.dumps([semester or None, school_year or None, start_date or None, end_date or None])
+    return hashlib.sha256(filters.encode()).hexdigest()
+
+def enqueue(semester, school_year, start_date, end_date, requested_by=None):
+    key = filters_key(semester, school_year, start_date, end_date)
+
+    # Identical filter sets within the TTL share one job (checked on the
+    # primary, which may be ahead of a replica)
+    job = ReportJob.objects.using(router.db_for_write(ReportJob)).filter(
+        Q(status__in=[ReportJob.PENDING, ReportJob.DONE]) | Q(status=ReportJob.RUNNING, started_at__gte=_stale_before()),
+        filters_key=key,
+        created_at__gte=timezone.now() - _ttl()
+    ).order_by('-created_at').first()
+    if job:
+        return job
+
+    job = ReportJob.objects.create(
+        filters_key=key,
+        semester=semester or None,
+        school_year=school_year or None,
+        start_date=start_date or None,
+        end_date=end_date or None,
+        requested_by=requested_by
+    )
+
+    if getattr(settings, 'REPORT_JOBS_IN_PROCESS', True):
+        transaction.on_commit(_submit_in_process)
+    return job
+
+def _submit_in_process():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='report-jobs')
+    _executor.submit(_run_in_thread)
+
+def _run_in_thread():
+    close_old_connections()
+    try:
+        run_pending_jobs()
+    finally:
+        close_old_connections()
+
+def claim_next_job():
+    with transaction.atomic():
+        job = (
+            ReportJob.objects.select_for_update(skip_locked=True)
+            .filter(Q(status=ReportJob.PENDING) | Q(status=ReportJob.RUNNING, started_at__lt=_stale_before()))
+            .order_by('created_at')
+            .first()
+        )
+        if job is None:
+            return None
+
+        job.status = ReportJob.RUNNING
+        job.started_at = timezone.now()
+        job.save(update_fields=['status', 'started_at'])
+    return job
+
+def run_job(job):
+    try:
+        payments = reports.filter_payments(job.semester, job.school_year, job.start_date, job.end_date)
+        summary = reports.get_summary(payments, job.semester, job.school_year, job.start_date, job.end_date)
+
+        with tempfile.TemporaryFile() as output:
+            build_treasurer_report_pdf(
+                output,
+                reports.summary_table(summary),
+                reports.payment_rows(payments),
+                job.semester or "N/A",
+                job.school_year or "N/A",
+                job.start_date or "N/A",
+                job.end_date or "N/A"
+            )
+            output.seek(0)
+            job.file.save(f"{job.id}.pdf", File(output), save=False)
+
+        job.status = ReportJob.DONE
+    except Exception as exc:
+        logger.exception("Report job %s failed", job.id)
+        job.status = ReportJob.FAILED
+        job.error = str(exc)
+
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'file', 'error', 'finished_at'])
+    return job
+
+def run_pending_jobs(limit=None):
+    processed = 0
+    while limit is None or processed < limit:
+        job = claim_next_job()
+        if job is None:
+            break
+        run_job(job)
+        processed += 1
+    return processed
+
+def download_filename(job):
+    return report_filename(job.semester or "N/A", job.school_year or "N/A", job.start_date or "N/A", job.end_date or "N/A")
+
+def purge_expired():
+    expired = ReportJob.objects.filter(created_at__lt=timezone.now() - _ttl()).exclude(
+        status=ReportJob.RUNNING,
+        started_at__gte=_stale_before()
+    )
+    count = 0
+    for job in expired.iterator():
+        if job.file:
+            job.file.delete(save=False)
+        job.delete()
+        count += 1
+    return count
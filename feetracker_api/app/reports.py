@@ -0,0 +1,111 @@
+from decimal import Decimal
+from datetime import timedelta
+from django.utils import timezone
+from django.db.models import Sum, Count, Q, F, DecimalField, Case, When, Value
+from .models import StudentPaymentHistory
+from . import ledger, report_cache
+
+# Treasurer report queries shared by TreasurerReportView and the report job worker
+
+FULL_PAYMENT_AMOUNT = Decimal("300.00")
+
+def parse_date(date_str):
+    if date_str:
+        date_obj = timezone.datetime.fromisoformat(date_str)
+        if timezone.is_naive(date_obj):
+            date_obj = timezone.make_aware(date_obj)
+        return date_obj
+    return None
+
+def filter_payments(semester, school_year, start_date_str, end_date_str):
+    payments = StudentPaymentHistory.objects.all()
+
+    start_date = parse_date(start_date_str)
+    end_date = parse_date(end_date_str)
+
+    if start_date:
+        payments = payments.filter(payment_date__gte=start_date)
+    if end_date:
+        end_date += timedelta(days=1)
+        payments = payments.filter(payment_date__lt=end_date)
+    if semester:
+        payments = payments.filter(semester=semester)
+    if school_year:
+        payments = payments.filter(school_year=school_year)
+
+    return payments
+
+def compute_summary(payments, semester, school_year, use_ledger):
+    money = DecimalField(max_digits=12, decimal_places=2)
+
+    # Term totals come from the balance ledger unless a date range is requested
+    if use_ledger:
+        students = ledger.balances(semester=semester, school_year=school_year).values('student_id').annotate(paid=Sum('total_paid'))
+    else:
+        students = payments.values('student_id').annotate(paid=Sum('amount_paid'))
+
+    # One pass over the grouped per-student totals
+    totals = students.aggregate(
+        students=Count('student_id'),
+        fully_paid=Count('student_id', filter=Q(paid__gte=FULL_PAYMENT_AMOUNT)),
+        received=Sum('paid', output_field=money),
+        balance=Sum(
+            Case(
+                When(paid__lt=FULL_PAYMENT_AMOUNT, then=Value(FULL_PAYMENT_AMOUNT) - F('paid')),
+                default=Value(Decimal("0.00")),
+                output_field=money
+            )
+        )
+    )
+
+    total_of_students = totals['students']
+    total_of_fully_paid_students = totals['fully_paid']
+    total_of_not_fully_paid_students = total_of_students - total_of_fully_paid_students
+
+    total_money_received = totals['received'] or Decimal("0.00")
+    total_balance_money = totals['balance'] or Decimal("0.00")
+    expected_total_money_received = FULL_PAYMENT_AMOUNT * total_of_students
+
+    fully_paid_percentage = (total_of_fully_paid_students / total_of_students * 100) if total_of_students else 0
+    not_fully_paid_percentage = (total_of_not_fully_paid_students / total_of_students * 100) if total_of_students else 0
+
+    return {
+        "total_money_received": total_money_received,
+        "total_balance_money": total_balance_money,
+        "expected_total_money_received": expected_total_money_received,
+        "total_of_students": total_of_students,
+        "total_of_fully_paid_students": total_of_fully_paid_students,
+        "total_of_not_fully_paid_students": total_of_not_fully_paid_students,
+        "fully_paid_percentage": fully_paid_percentage,
+        "not_fully_paid_percentage": not_fully_paid_percentage
+    }
+
+def get_summary(payments, semester, school_year, start_date_str, end_date_str):
+    use_ledger = not (start_date_str or end_date_str)
+    return report_cache.get_summary(
+        semester,
+        school_year,
+        start_date_str,
+        end_date_str,
+        lambda: compute_summary(payments, semester, school_year, use_ledger)
+    )
+
+def summary_table(summary):
+    return [
+        ["Total Money Received", summary["total_money_received"]],
+        ["Total Balance Money", summary["total_balance_money"]],
+        ["Expected Total Money Received", summary["expected_total_money_received"]],
+        ["Total Students", summary["total_of_students"]],
+        ["Fully Paid Students", summary["total_of_fully_paid_students"]],
+        ["Not Fully Paid Students", summary["total_of_not_fully_paid_students"]],
+        ["Fully Paid %", round(summary["fully_paid_percentage"], 2)],
+        ["Not Fully Paid %", round(summary["not_fully_paid_percentage"], 2)]
+    ]
+
+def payment_rows(payments):
+    return (
+        (student_id, payment_date.strftime("%Y-%m-%d"), amount_paid)
+        for student_id, payment_date, amount_paid in payments.order_by('student_id', 'payment_date')
+        .values_list('student_id', 'payment_date', 'amount_paid')
+        .iterator(chunk_size=2000)
+    )
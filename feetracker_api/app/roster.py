@@ -0,0 +1,134 @@
+import io
+import csv
+import json
+from concurrent.futures import ProcessPoolExecutor
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from .models import StudentRecord, StudentAccount, StudentOtp
+from .serializers import StudentRegisterSerializer
+from .hashers import hashing_pool
+from . import otp, versions
+
+# Bulk student roster import used by AdminBulkCreateStudentAccountsView and the
+# import_students command. Rows follow StudentRegisterSerializer and get the same
+# treatment as AdminCreateStudentAccountView: verified accounts, no OTP.
+# The endpoint takes at most ROSTER_BULK_MAX_ROWS rows and hashes on the shared
+# request-path pool (bounded by HASHING_MAX_PENDING); the command takes whole
+# intakes and can use a process pool instead.
+
+RECORD_FIELDS = ['email', 'first_name', 'middle_name', 'last_name', 'contact_number', 'birthdate', 'address', 'full_name']
+ACCOUNT_FIELDS = ['password', 'is_verified']
+
+def parse_roster(content, fmt):
+    if isinstance(content, bytes):
+        content = content.decode('utf-8-sig')
+
+    if fmt == 'csv':
+        return [
+            {key: value for key, value in row.items() if key and value not in (None, '')}
+            for row in csv.DictReader(io.StringIO(content))
+        ]
+    if fmt == 'jsonl':
+        return [json.loads(line) for line in content.splitlines() if line.strip()]
+    raise ValueError(f"Unsupported roster format: {fmt}")
+
+def _lookup(queryset, field, values, chunk_size=1000):
+    values = list(values)
+    found = set()
+    for start in range(0, len(values), chunk_size):
+        found.update(
+            queryset.filter(**{f"{field}__in": values[start:start + chunk_size]}).values_list(field, flat=True)
+        )
+    return found
+
+def hash_passwords(passwords):
+    return hashing_pool.map(make_password, passwords)
+
+# Offline imports only: a process pool per call would let any request take every CPU
+def hash_passwords_in_processes(passwords):
+    workers = getattr(settings, 'ROSTER_HASH_WORKERS', 4)
+    if workers <= 1 or len(passwords) < workers * 4:
+        return [make_password(password) for password in passwords]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(make_password, passwords, chunksize=max(1, len(passwords) // (workers * 4))))
+
+def validate_rows(rows):
+    valid = []
+    errors = []
+    seen_ids = set()
+    seen_emails = set()
+
+    for index, row in enumerate(rows, start=1):
+        serializer = StudentRegisterSerializer(data=row)
+        if not serializer.is_valid():
+            errors.append({"row": index, "student_id": row.get('student_id'), "errors": serializer.errors})
+            continue
+
+        data = serializer.validated_data
+        if data['student_id'] in seen_ids:
+            errors.append({"row": index, "student_id": data['student_id'], "errors": {"student_id": ["Duplicate Student ID in upload."]}})
+            continue
+        if data['email'] in seen_emails:
+            errors.append({"row": index, "student_id": data['student_id'], "errors": {"email": ["Duplicate Email in upload."]}})
+            continue
+
+        seen_ids.add(data['student_id'])
+        seen_emails.add(data['email'])
+        valid.append((index, data))
+
+    # Existing rows are checked with a few set lookups for the whole batch
+    verified_ids = _lookup(StudentAccount.objects.filter(is_verified=True), 'student_id', seen_ids)
+    used_emails = _lookup(StudentRecord.objects.all(), 'email', seen_emails)
+
+    accepted = []
+    for index, data in valid:
+        if data['student_id'] in verified_ids:
+            errors.append({"row": index, "student_id": data['student_id'], "errors": {"student_id": ["This Student ID is already verified."]}})
+        elif data['email'] in used_emails:
+            errors.append({"row": index, "student_id": data['student_id'], "errors": {"email": ["This Email is already registered."]}})
+        else:
+            accepted.append(data)
+
+    return accepted, sorted(errors, key=lambda error: error["row"])
+
+def import_roster(rows, batch_size=500, hash_passwords=hash_passwords):
+    accepted, errors = validate_rows(rows)
+    if not accepted:
+        return {"created": 0, "updated": 0, "errors": errors}
+
+    hashed_passwords = hash_passwords([data['password'] for data in accepted])
+
+    student_ids = [data['student_id'] for data in accepted]
+    existing_records = _lookup(StudentRecord.objects.all(), 'student_id', student_ids)
+    existing_accounts = _lookup(StudentAccount.objects.all(), 'student_id', student_ids)
+
+    new_records, updated_records = [], []
+    new_accounts, updated_accounts = [], []
+    for data, password in zip(accepted, hashed_passwords):
+        record = StudentRecord(
+            student_id=data['student_id'],
+            email=data['email'],
+            first_name=data['first_name'],
+            middle_name=data.get('middle_name', ''),
+            last_name=data['last_name'],
+            contact_number=data.get('contact_number'),
+            birthdate=data.get('birthdate'),
+            address=data.get('address'),
+            full_name=" ".join(filter(None, [data['first_name'], data.get('middle_name'), data['last_name']]))
+        )
+        (updated_records if record.student_id in existing_records else new_records).append(record)
+
+        account = StudentAccount(student_id=record.student_id, password=password, is_verified=True)
+        (updated_accounts if record.student_id in existing_accounts else new_accounts).append(account)
+
+    with transaction.atomic():
+        StudentRecord.objects.bulk_create(new_records, batch_size=batch_size)
+        StudentRecord.objects.bulk_update(updated_records, RECORD_FIELDS, batch_size=batch_size)
+        StudentAccount.objects.bulk_create(new_accounts, batch_size=batch_size)
+        StudentAccount.objects.bulk_update(updated_accounts, ACCOUNT_FIELDS, batch_size=batch_size)
+        versions.bump_many(student_ids)
+        otp.discard_many(student_ids, StudentOtp.VERIFY)
+
+    return {"created": len(new_records), "updated": len(updated_records), "errors": errors}
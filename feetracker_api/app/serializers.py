@@ -10,12 +10,24 @@ class StudentTokenRefreshSerializer(TokenRefreshSerializer):
             raise ValidationError({"refresh": "Refresh token is required."})
         
         try:
+            # Rejects tokens that are already blacklisted
             refresh = RefreshToken(refresh_token)
-            access = refresh.access_token
-            access["student_id"] = refresh.get("student_id")
-            return {"refresh": str(refresh), "access": str(access)}
         except TokenError:
             raise ValidationError({"refresh": "Invalid refresh token."})
+
+        # Single use: whoever blacklists the token first gets the new pair
+        _, created = refresh.blacklist()
+        if not created:
+            raise ValidationError({"refresh": "Invalid refresh token."})
+
+        refresh.set_jti()
+        refresh.set_exp()
+        refresh.set_iat()
+        refresh.outstand()
+
+        access = refresh.access_token
+        access["student_id"] = refresh.get("student_id")
+        return {"refresh": str(refresh), "access": str(access)}
     
 class StudentLoginSerializer(serializers.Serializer):
     student_id = serializers.CharField()
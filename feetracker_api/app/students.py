@@ -0,0 +1,19 @@
+from .models import StudentRecord
+
+# Student record plus its account (verification status) in one joined query,
+# limited to the columns the caller renders. Returns None when there is no
+# record; account_of() is None when the record has no account.
+
+def load_student(student_id, *fields):
+    try:
+        return (
+            StudentRecord.objects
+            .select_related('studentaccount')
+            .only('student_id', 'studentaccount__is_verified', *fields)
+            .get(student_id=student_id)
+        )
+    except StudentRecord.DoesNotExist:
+        return None
+
+def account_of(student):
+    return getattr(student, 'studentaccount', None) if student else None
@@ -0,0 +1,846 @@
+import json
+import threading
+from unittest import skipUnless
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+from django.apps import apps
+from django.conf import settings
+from django.db import connection, connections, transaction, OperationalError
+from django.test.utils import CaptureQueriesContext
+from django.core import mail
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from . import db_router, db_stats, ledger, otp, outbox, report_cache, report_jobs, roster, versions
+from .payload_cache import student_payloads
+from .throttling import ClientIPThrottle
+from .hashers import HashingPool, HashingBusy
+from .models import StudentRecord, StudentAccount, StudentPaymentHistory, StudentTermBalance, StudentOtp, OutboxEmail, ReceiptSequence, ReportJob
+from .receipts import ReceiptAllocator, receipt_allocator
+
+def api_client(**claims):
+    token = RefreshToken().access_token
+    for name, value in claims.items():
+        token[name] = value
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+    return client
+
+def treasurer_client():
+    return api_client(role='treasurer', username='treasurer')
+
+class PaymentRolledBack(Exception):
+    pass
+
+# Index names in the database's plan for `sql`
+def query_plan(sql):
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+            return " ".join(row[-1] for row in cursor.fetchall())
+        cursor.execute(f"EXPLAIN {sql}")
+        columns = [column[0] for column in cursor.description]
+        return " ".join(str(dict(zip(columns, row)).get('key')) for row in cursor.fetchall())
+
+def run_threads(target, count):
+    errors = []
+
+    def run(index):
+        try:
+            target(index)
+        except Exception as exc:
+            errors.append(exc)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=run, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return errors
+
+# Receipt IDs under concurrent workers
+class ReceiptAllocatorTests(TransactionTestCase):
+    def setUp(self):
+        receipt_allocator.reset()
+
+    def record_payment(self, allocator, student_id, roll_back=False):
+        receipt_id = allocator.next_receipt_id()
+        recorded = False
+        try:
+            with transaction.atomic():
+                StudentPaymentHistory.objects.create(
+                    receipt_id=receipt_id,
+                    student_id=student_id,
+                    semester='1',
+                    school_year='2024',
+                    amount_paid=Decimal('10.00')
+                )
+                if roll_back:
+                    raise PaymentRolledBack()
+            recorded = True
+        except PaymentRolledBack:
+            pass
+        finally:
+            if not recorded:
+                allocator.give_back(receipt_id)
+        return receipt_id if recorded else None
+
+    def test_parallel_workers_with_rollbacks_never_issue_an_id_twice(self):
+        # One allocator per thread stands in for one allocator per worker process
+        workers = [ReceiptAllocator(block_size=3) for _ in range(6)]
+        issued = [[] for _ in workers]
+
+        def work(index):
+            for number in range(15):
+                receipt_id = self.record_payment(workers[index], f"S{index}", roll_back=number % 4 == 1)
+                if receipt_id:
+                    issued[index].append(receipt_id)
+
+        self.assertEqual(run_threads(work, len(workers)), [])
+
+        receipt_ids = [receipt_id for ids in issued for receipt_id in ids]
+        self.assertEqual(len(receipt_ids), len(set(receipt_ids)))
+        stored = list(StudentPaymentHistory.objects.values_list('receipt_id', flat=True))
+        self.assertEqual(sorted(stored), sorted(receipt_ids))
+
+    def test_rolled_back_id_is_reused_by_the_same_worker(self):
+        allocator = ReceiptAllocator(block_size=5)
+        self.assertIsNone(self.record_payment(allocator, 'S1', roll_back=True))
+        first = self.record_payment(allocator, 'S1')
+        self.assertEqual(first, 'CTUG101')
+        self.assertEqual(ReceiptSequence.objects.get().next_number, 106)
+
+    def test_block_reserved_in_a_rolled_back_transaction_is_dropped(self):
+        first, second = ReceiptAllocator(block_size=5), ReceiptAllocator(block_size=5)
+        with self.assertRaises(PaymentRolledBack):
+            with transaction.atomic():
+                self.assertEqual(first.next_receipt_id(), 'CTUG101')
+                raise PaymentRolledBack()
+
+        # The sequence rewound, so the other worker owns 101-105 now
+        self.assertEqual(second.next_receipt_id(), 'CTUG101')
+        self.assertEqual(first.next_receipt_id(), 'CTUG106')
+
+    def test_parallel_add_payment_requests(self):
+        client = treasurer_client()
+        client.raise_request_exception = False
+        responses = []
+        original_bump = versions.bump
+
+        # Every payment for student "FAIL" blows up after its row is written
+        def bump(student_id):
+            if student_id == 'FAIL':
+                raise PaymentRolledBack()
+            return original_bump(student_id)
+
+        def work(index):
+            for _ in range(4):
+                student_id = 'FAIL' if index % 3 == 0 else f"S{index}"
+                response = client.post('/api/treasurer/add-payment/', {
+                    'student_id': student_id, 'semester': 1, 'school_year': 2024, 'amount_paid': '10.00'
+                }, format='json')
+                responses.append((student_id, response.status_code, getattr(response, 'data', None)))
+
+        with mock.patch.object(versions, 'bump', side_effect=bump):
+            self.assertEqual(run_threads(work, 6), [])
+
+        created = [data['receipt_id'] for _, code, data in responses if code == 201]
+        self.assertEqual(len(created), 16)
+        self.assertEqual(len(created), len(set(created)))
+        self.assertTrue(all(code == 500 for student_id, code, _ in responses if student_id == 'FAIL'))
+        self.assertFalse(StudentPaymentHistory.objects.filter(student_id='FAIL').exists())
+        self.assertEqual(StudentPaymentHistory.objects.count(), 16)
+
+class AddPaymentTests(TransactionTestCase):
+    def setUp(self):
+        receipt_allocator.reset()
+        self.client = treasurer_client()
+
+    def pay(self, amount, student_id='S1'):
+        return self.client.post('/api/treasurer/add-payment/', {
+            'student_id': student_id, 'semester': 1, 'school_year': 2024, 'amount_paid': amount
+        }, format='json')
+
+    def test_rejected_payment_does_not_consume_a_receipt(self):
+        self.assertEqual(self.pay('250.00').status_code, 201)
+        self.assertEqual(self.pay('100.00').status_code, 400)
+        response = self.pay('50.00')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['receipt_id'], 'CTUG102')
+        self.assertEqual(StudentTermBalance.objects.get(student_id='S1').total_paid, Decimal('300.00'))
+
+class LedgerRebuildTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_rebuild_matches_history_and_retires_cached_reports(self):
+        for receipt_id, amount in (('CTUG101', '100.00'), ('CTUG102', '50.00')):
+            StudentPaymentHistory.objects.create(
+                receipt_id=receipt_id, student_id='S1', semester='1', school_year='2024', amount_paid=Decimal(amount)
+            )
+        StudentTermBalance.objects.create(student_id='S9', semester='1', school_year='2024', total_paid=5, payment_count=1)
+
+        computed = []
+        def summary():
+            return report_cache.get_summary('1', '2024', None, None, lambda: computed.append(1) or len(computed))
+
+        self.assertEqual(summary(), 1)
+        self.assertEqual(summary(), 1)
+        self.assertEqual(ledger.rebuild(), 1)
+        self.assertEqual(ledger.verify(), [])
+        self.assertEqual(StudentTermBalance.objects.get().total_paid, Decimal('150.00'))
+        self.assertEqual(summary(), 2)
+
+# Version-keyed payload and ETag caches on the student dashboard
+class StudentDashboardCacheTests(TestCase):
+    url = '/api/student/dashboard/'
+
+    def setUp(self):
+        cache.clear()
+        student_payloads.clear()
+        StudentRecord.objects.create(student_id='S1', email='s1@example.com', first_name='Ana')
+        StudentPaymentHistory.objects.create(receipt_id='CTUG1', student_id='S1', semester='1', school_year='2024', amount_paid=Decimal('100.00'))
+        ledger.rebuild()
+        self.client = api_client(role='student', student_id='S1')
+
+    def total_paid(self, response):
+        return response.data['student']['total_paid']
+
+    def test_unchanged_data_is_not_modified(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first.status_code, 200)
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], first['ETag'])
+
+    def test_version_bump_serves_fresh_data(self):
+        first = self.client.get(self.url)
+        ledger.apply_payment('S1', '1', '2024', Decimal('50.00'))
+        versions.bump('S1')
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.total_paid(response), '₱150.00')
+
+    def test_rebuild_retires_cached_totals(self):
+        StudentTermBalance.objects.filter(student_id='S1').update(total_paid=Decimal('999.00'))
+        versions.bump('S1')
+        first = self.client.get(self.url)
+        self.assertEqual(self.total_paid(first), '₱999.00')
+
+        ledger.rebuild()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.total_paid(response), '₱100.00')
+
+# Hot payment-history queries must stay on the indexes built for them
+class PaymentHistoryIndexTests(TestCase):
+    table = StudentPaymentHistory._meta.db_table
+
+    @classmethod
+    def setUpTestData(cls):
+        StudentRecord.objects.create(student_id='S1', email='s1@example.com', full_name='Student One', first_name='Student')
+        for number in range(40):
+            StudentPaymentHistory.objects.create(
+                receipt_id=f"CTUG{200 + number}",
+                student_id=f"S{number % 8}",
+                semester=str(number % 2 + 1),
+                school_year=str(2020 + number % 5),
+                amount_paid=Decimal('10.00')
+            )
+
+    def setUp(self):
+        cache.clear()
+
+    def history_plans(self, client, url):
+        with CaptureQueriesContext(connection) as captured:
+            response = client.get(url)
+        self.assertEqual(response.status_code, 200, url)
+        return [
+            query_plan(query['sql']) for query in captured.captured_queries
+            if query['sql'].startswith('SELECT') and connection.ops.quote_name(self.table) in query['sql'].split(' WHERE ')[0]
+        ]
+
+    def assertIndexed(self, client, url, expected):
+        plans = self.history_plans(client, url)
+        self.assertTrue(plans, f"{url} did not read payment history")
+        for plan in plans:
+            self.assertTrue(any(index in plan for index in expected), f"{url}: {plan}")
+
+    def test_student_views(self):
+        client = api_client(role='student', student_id='S1')
+        for url in ('/api/student/dashboard/', '/api/student/dashboard/?format=compact', '/api/student/payment-history/'):
+            self.assertIndexed(client, url, ['payment_student_date_idx', 'payment_student_term_idx'])
+
+    def test_treasurer_dashboard(self):
+        client = treasurer_client()
+        plans = self.history_plans(client, '/api/treasurer/dashboard/?semester=1&school_year=2022')
+        self.assertEqual(len(plans), 2)
+        self.assertIn('payment_term_student_idx', plans[0])
+        self.assertIn('payment_date_idx', plans[1])
+
+    def test_treasurer_report_date_range(self):
+        client = treasurer_client()
+        self.assertIndexed(
+            client,
+            '/api/treasurer/report/?semester=1&school_year=2022&start_date=2020-01-01&end_date=2030-01-01',
+            ['payment_term_student_idx', 'payment_date_idx']
+        )
+
+@override_settings(REPORT_JOB_TTL=600, REPORT_JOB_RUN_TIMEOUT=900)
+class ReportJobTests(TestCase):
+    def running_job(self, started_minutes_ago, created_minutes_ago=None):
+        job = report_jobs.enqueue('1', '2024', None, None)
+        created_at = timezone.now() - timedelta(minutes=created_minutes_ago or started_minutes_ago)
+        ReportJob.objects.filter(pk=job.pk).update(
+            status=ReportJob.RUNNING,
+            created_at=created_at,
+            started_at=timezone.now() - timedelta(minutes=started_minutes_ago)
+        )
+        return job
+
+    def test_live_running_job_is_shared_and_not_reclaimed(self):
+        job = self.running_job(started_minutes_ago=1)
+        self.assertEqual(report_jobs.enqueue('1', '2024', None, None).pk, job.pk)
+        self.assertIsNone(report_jobs.claim_next_job())
+
+    def test_stale_running_job_is_reclaimed(self):
+        job = self.running_job(started_minutes_ago=20, created_minutes_ago=5)
+        self.assertNotEqual(report_jobs.enqueue('1', '2024', None, None).pk, job.pk)
+        self.assertEqual(report_jobs.claim_next_job().pk, job.pk)
+        job.refresh_from_db()
+        self.assertEqual(job.status, ReportJob.RUNNING)
+        self.assertGreater(job.started_at, timezone.now() - timedelta(minutes=1))
+
+    def test_stale_running_job_is_purged_once_expired(self):
+        live = self.running_job(started_minutes_ago=1, created_minutes_ago=11)
+        ReportJob.objects.create(filters_key='other', status=ReportJob.RUNNING)
+        ReportJob.objects.filter(filters_key='other').update(
+            created_at=timezone.now() - timedelta(minutes=30),
+            started_at=timezone.now() - timedelta(minutes=30)
+        )
+        self.assertEqual(report_jobs.purge_expired(), 1)
+        self.assertEqual(list(ReportJob.objects.values_list('pk', flat=True)), [live.pk])
+
+class HashingPoolTests(TestCase):
+    def test_map_keeps_order_and_at_most_workers_in_flight(self):
+        pool = HashingPool(workers=2, max_pending=8)
+        active, peak = [0], [0]
+        lock = threading.Lock()
+
+        def square(value):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            threading.Event().wait(0.01)
+            with lock:
+                active[0] -= 1
+            return value * value
+
+        self.assertEqual(pool.map(square, range(10)), [value * value for value in range(10)])
+        self.assertLessEqual(peak[0], 2)
+
+    def test_map_is_refused_when_the_pool_is_full(self):
+        pool = HashingPool(workers=1, max_pending=0)
+        started, release = threading.Event(), threading.Event()
+
+        def hold_the_only_slot():
+            started.set()
+            release.wait()
+
+        caller = threading.Thread(target=pool.call, args=(hold_the_only_slot,))
+        caller.start()
+        started.wait()
+        try:
+            with self.assertRaises(HashingBusy):
+                pool.map(str, range(3))
+        finally:
+            release.set()
+            caller.join()
+        self.assertEqual(pool.map(str, range(3)), ['0', '1', '2'])
+
+class RosterImportTests(TestCase):
+    def test_endpoint_import_hashes_on_the_request_pool(self):
+        rows = [
+            {'student_id': f"R{number}", 'email': f"r{number}@example.com", 'first_name': 'Roster', 'last_name': 'Student', 'password': 'Secret123!'}
+            for number in range(3)
+        ]
+        client = api_client(role='admin', username='admin')
+        with mock.patch.object(roster, 'ProcessPoolExecutor') as process_pool, \
+                mock.patch.object(roster.hashing_pool, 'map', wraps=roster.hashing_pool.map) as pool_map:
+            response = client.post(
+                '/api/admin/create/student-accounts/bulk/',
+                "\n".join(json.dumps(row) for row in rows),
+                content_type='application/x-ndjson'
+            )
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data['created'], 3)
+        process_pool.assert_not_called()
+        pool_map.assert_called_once()
+
+    def post_roster(self, rows):
+        return api_client(role='admin', username='admin').post(
+            '/api/admin/create/student-accounts/bulk/',
+            "\n".join(json.dumps(row) for row in rows),
+            content_type='application/x-ndjson'
+        )
+
+    def roster_rows(self, count):
+        return [
+            {'student_id': f"R{number}", 'email': f"r{number}@example.com", 'first_name': 'Roster', 'last_name': 'Student', 'password': 'Secret123!'}
+            for number in range(count)
+        ]
+
+    @override_settings(ROSTER_BULK_MAX_ROWS=2)
+    def test_endpoint_caps_rows_per_upload(self):
+        with mock.patch.object(roster.hashing_pool, 'map') as pool_map:
+            response = self.post_roster(self.roster_rows(3))
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('import_students', response.data['detail'])
+        pool_map.assert_not_called()
+        self.assertFalse(StudentRecord.objects.exists())
+
+    def test_import_discards_pending_verification_codes(self):
+        otp.issue('R0', StudentOtp.VERIFY)
+        otp.issue('R0', StudentOtp.RESET)
+        self.assertEqual(self.post_roster(self.roster_rows(1)).status_code, 200)
+        self.assertEqual(list(StudentOtp.objects.values_list('purpose', flat=True)), [StudentOtp.RESET])
+
+# SQLite compares case-sensitively; rebuild the ledger table (inside the test
+# transaction, so it is rolled back) with a case-insensitive student_id the
+# way MySQL's default collation behaves
+@contextmanager
+def case_insensitive_ledger_ids():
+    table = StudentTermBalance._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT type, sql FROM sqlite_master WHERE tbl_name = %s AND sql IS NOT NULL", [table])
+        objects = cursor.fetchall()
+        cursor.execute(f'DROP TABLE "{table}"')
+        for kind, sql in sorted(objects, key=lambda item: item[0] != 'table'):
+            if kind == 'table':
+                sql = sql.replace('"student_id" varchar(20) NOT NULL', '"student_id" varchar(20) NOT NULL COLLATE NOCASE')
+            cursor.execute(sql)
+    yield
+
+class BulkPaymentTests(TestCase):
+    def setUp(self):
+        receipt_allocator.reset()
+
+    def test_ids_differing_only_in_case_share_one_running_total(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest("Collation is rebuilt with SQLite DDL")
+        with case_insensitive_ledger_ids():
+            StudentTermBalance.objects.create(student_id='S1', semester='1', school_year='2024', total_paid=Decimal('250.00'), payment_count=1)
+            response = treasurer_client().post('/api/treasurer/add-payments/bulk/', {'payments': [
+                {'student_id': 's1', 'semester': 1, 'school_year': 2024, 'amount_paid': '30.00'},
+                {'student_id': 'S1', 'semester': 1, 'school_year': 2024, 'amount_paid': '30.00'},
+            ]}, format='json')
+
+            self.assertEqual(response.status_code, 201)
+            self.assertEqual([result['status'] for result in response.data['results']], ['accepted', 'rejected'])
+            term = StudentTermBalance.objects.get()
+            self.assertEqual((term.total_paid, term.payment_count), (Decimal('280.00'), 2))
+
+    def test_counts_cover_every_submitted_row(self):
+        response = treasurer_client().post('/api/treasurer/add-payments/bulk/', {'payments': [
+            {'student_id': 'S1', 'semester': 1, 'school_year': 2024, 'amount_paid': '50.00'},
+            {'student_id': 'S1', 'semester': 1, 'school_year': 2024, 'amount_paid': '50.00'},
+            {'student_id': 'S1', 'semester': 1, 'school_year': 2024, 'amount_paid': '50.00'},
+            {'student_id': 'S1', 'semester': 'first', 'school_year': 2024, 'amount_paid': '50.00'},
+        ]}, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.data['accepted'], response.data['rejected']), (3, 1))
+        self.assertEqual(response.data['detail'], "3 payment(s) recorded, 1 rejected.")
+
+    def test_all_invalid_rows_are_reported_rejected(self):
+        response = treasurer_client().post('/api/treasurer/add-payments/bulk/', {'payments': [
+            {'student_id': 'S1', 'semester': 'first', 'school_year': 2024, 'amount_paid': '50.00'},
+            {'student_id': 'S1', 'semester': 1, 'school_year': 2024},
+        ]}, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual((response.data['accepted'], response.data['rejected']), (0, 2))
+
+class StudentBalanceBrowserTests(TestCase):
+    url = '/api/treasurer/student-balance/'
+
+    @classmethod
+    def setUpTestData(cls):
+        for student_id, name in (('S1', 'Ana Cruz'), ('S2', 'Ben Diaz'), ('S3', 'Carla Evora'), ('S4', 'Ana Bell')):
+            StudentRecord.objects.create(student_id=student_id, email=f"{student_id}@example.com", full_name=name)
+        for student_id, paid, count in (('S1', '300.00', 2), ('S2', '100.00', 1), ('S4', '0.00', 0), ('X9', '50.00', 1), ('X8', '0.00', 1)):
+            StudentTermBalance.objects.create(student_id=student_id, semester='1', school_year='2024', total_paid=Decimal(paid), payment_count=count)
+        StudentTermBalance.objects.create(student_id='S1', semester='2', school_year='2023', total_paid=Decimal('300.00'), payment_count=1)
+
+    def setUp(self):
+        self.client = treasurer_client()
+
+    def ids(self, **params):
+        response = self.client.get(self.url, {'semester': 1, 'school_year': 2024, **params})
+        self.assertEqual(response.status_code, 200, response.data)
+        return [row['student_id'] for row in response.data['data']], response.data['next_cursor']
+
+    def all_pages(self, **params):
+        ids, cursor = self.ids(limit=2, **params)
+        while cursor:
+            page, cursor = self.ids(limit=2, cursor=cursor, **params)
+            ids += page
+        return ids
+
+    def test_pages_across_payers_roster_and_orphans(self):
+        self.assertEqual(self.all_pages(), ['S1', 'S2', 'S3', 'S4', 'X8', 'X9'])
+        self.assertEqual(self.all_pages(sort='total_paid'), ['S3', 'S4', 'X8', 'X9', 'S2', 'S1'])
+        self.assertEqual(self.all_pages(sort='-total_paid'), ['S1', 'S2', 'X9', 'X8', 'S4', 'S3'])
+        self.assertEqual(self.all_pages(sort='name'), ['X8', 'X9', 'S4', 'S1', 'S2', 'S3'])
+
+    def test_status_filters(self):
+        self.assertEqual(self.ids(status='unpaid')[0], ['S3', 'S4', 'X8'])
+        self.assertEqual(self.ids(status='partial')[0], ['S2', 'X9'])
+        self.assertEqual(self.ids(status='fully_paid')[0], ['S1'])
+
+    def test_search_by_id_or_name_prefix(self):
+        self.assertEqual(self.ids(search='ana')[0], ['S1', 'S4'])
+        self.assertEqual(self.ids(search='x')[0], ['X8', 'X9'])
+        self.assertEqual(self.ids(search='cruz')[0], [])
+
+    def test_defaults_to_the_latest_term(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['semester'], response.data['school_year']), ('1', '2024'))
+        response = self.client.get(self.url, {'school_year': 2023})
+        self.assertEqual((response.data['semester'], response.data['school_year']), ('2', '2023'))
+        self.assertEqual([row['student_id'] for row in response.data['data']][:1], ['S1'])
+
+    def test_amount_sort_and_status_use_the_ledger_index(self):
+        table = connection.ops.quote_name(StudentTermBalance._meta.db_table)
+        for params in ({'sort': '-total_paid'}, {'status': 'partial'}):
+            with CaptureQueriesContext(connection) as captured:
+                self.ids(**params)
+            plans = [query_plan(query['sql']) for query in captured.captured_queries if query['sql'].startswith(f"SELECT {table}")]
+            self.assertTrue(plans, params)
+            self.assertIn('balance_term_paid_idx', plans[0], params)
+
+# Queries per request on the student hot paths, cold and with the payload
+# cache warm. Raise a budget only together with the change that needs it.
+class StudentQueryBudgetTests(TestCase):
+    budgets = {
+        ('/api/student/profile/', None): (2, 1),
+        ('/api/student/dashboard/', None): (4, 1),
+        ('/api/student/dashboard/', 'application/vnd.feetracker.compact+json'): (4, 1),
+        ('/api/student/payment-history/', None): (3, 1),
+        ('/api/student/payment-history/', 'application/vnd.feetracker.compact+json'): (3, 1),
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        student = StudentRecord.objects.create(
+            student_id='S1', email='s1@example.com', first_name='Ana', full_name='Ana Cruz', address='Cebu City'
+        )
+        StudentAccount.objects.create(student=student, password='!', is_verified=True)
+        for number, (semester, school_year) in enumerate((('1', '2023'), ('2', '2023'), ('1', '2024'))):
+            StudentPaymentHistory.objects.create(
+                receipt_id=f"CTUG{number}", student_id='S1', semester=semester, school_year=school_year, amount_paid=Decimal('100.00')
+            )
+        ledger.rebuild()
+
+    def setUp(self):
+        cache.clear()
+        student_payloads.clear()
+        self.client = api_client(role='student', student_id='S1')
+
+    def test_student_endpoints_stay_within_budget(self):
+        for (url, accept), (cold, warm) in self.budgets.items():
+            headers = {'HTTP_ACCEPT': accept} if accept else {}
+            for budget in (cold, warm):
+                with self.subTest(url=url, accept=accept, budget=budget), self.assertNumQueries(budget):
+                    response = self.client.get(url, **headers)
+                    self.assertEqual(response.status_code, 200)
+
+# Unauthenticated endpoints: shared counters and cheap rejections
+class ThrottleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_concurrent_requests_never_exceed_the_limit(self):
+        request = RequestFactory().post('/api/student/login/', REMOTE_ADDR='10.0.0.1')
+        view = mock.Mock(throttle_scope='login')
+        allowed = []
+
+        def attempt(index):
+            if ClientIPThrottle().allow_request(request, view):
+                allowed.append(index)
+
+        with mock.patch.object(ClientIPThrottle, 'get_rate', return_value=('login', (20, 60))):
+            self.assertEqual(run_threads(attempt, 50), [])
+        self.assertEqual(len(allowed), 20)
+
+    def test_bursts_do_not_double_up_across_a_window_boundary(self):
+        request = RequestFactory().post('/api/student/login/', REMOTE_ADDR='10.0.0.2')
+        view = mock.Mock(throttle_scope='login')
+
+        def allowed_at(seconds, attempts):
+            with mock.patch('app.throttling.time.time', return_value=600000 + seconds):
+                return sum(ClientIPThrottle().allow_request(request, view) for _ in range(attempts))
+
+        with mock.patch.object(ClientIPThrottle, 'get_rate', return_value=('login', (5, 60))):
+            self.assertEqual(allowed_at(59, 10), 5)
+            # Next window: the previous five still weigh 59/60
+            self.assertEqual(allowed_at(61, 10), 0)
+            # Two thirds of the way in, a third of them still counts
+            self.assertEqual(allowed_at(100, 10), 3)
+
+    def test_rejected_login_touches_no_database(self):
+        client = APIClient()
+        body = {'student_id': 'S404', 'password': 'wrong'}
+        for _ in range(5):
+            self.assertEqual(client.post('/api/student/login/', body, format='json').status_code, 401)
+
+        with self.assertNumQueries(0):
+            response = client.post('/api/student/login/', body, format='json')
+        self.assertEqual(response.status_code, 429)
+        self.assertTrue(0 < int(response['Retry-After']) <= 60)
+
+# Primary and replica are separate SQLite files holding different data, so
+# each response shows which one served it
+@skipUnless('replica1' in settings.DATABASES, "needs feetracker_api.replica_test_settings")
+class ReplicaRoutingTests(TestCase):
+    databases = {'default', 'replica1'} & set(settings.DATABASES)
+    balance_url = '/api/treasurer/student-balance/?semester=1&school_year=2024'
+
+    # The router keeps migrations off replicas, so the replica gets its tables here
+    @classmethod
+    def setUpClass(cls):
+        with connections['replica1'].schema_editor() as editor:
+            for model in apps.get_app_config('app').get_models():
+                editor.create_model(model)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        with connections['replica1'].schema_editor() as editor:
+            for model in apps.get_app_config('app').get_models():
+                editor.delete_model(model)
+
+    @classmethod
+    def setUpTestData(cls):
+        for alias, first_name, paid in (('default', 'Primary', '100.00'), ('replica1', 'Replica', '50.00')):
+            StudentRecord.objects.using(alias).create(student_id='S1', email='s1@example.com', first_name=first_name, full_name=f"Ana {first_name}")
+            StudentTermBalance.objects.using(alias).create(student_id='S1', semester='1', school_year='2024', total_paid=Decimal(paid), payment_count=1)
+
+    def setUp(self):
+        cache.clear()
+        student_payloads.clear()
+        db_router._down_until.clear()
+        receipt_allocator.reset()
+        self.addCleanup(db_router._down_until.clear)
+
+    def first_name(self):
+        # Both databases are at the same data version, so skip the payload cache
+        student_payloads.clear()
+        response = api_client(role='student', student_id='S1').get('/api/student/dashboard/')
+        self.assertEqual(response.status_code, 200)
+        return response.data['student']['first_name']
+
+    def total_paid(self, client):
+        response = client.get(self.balance_url)
+        self.assertEqual(response.status_code, 200)
+        return response.data['data'][0]['total_paid']
+
+    def test_read_views_use_the_replica(self):
+        self.assertEqual(self.first_name(), 'Replica')
+        self.assertEqual(self.total_paid(treasurer_client()), '₱50.00')
+
+    def test_writer_is_pinned_to_the_primary(self):
+        client, other = treasurer_client(), api_client(role='treasurer', username='other')
+        response = client.post('/api/treasurer/add-payment/', {
+            'student_id': 'S1', 'semester': 1, 'school_year': 2024, 'amount_paid': '25.00'
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+
+        self.assertEqual(self.total_paid(client), '₱125.00')
+        self.assertEqual(self.total_paid(other), '₱50.00')
+
+    def test_report_summary_is_cached_from_the_primary(self):
+        client, other = treasurer_client(), api_client(role='treasurer', username='other')
+        url = '/api/treasurer/report/?semester=1&school_year=2024'
+        self.assertEqual(other.get(url).data['total_money_received'], 100.0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client.post('/api/treasurer/add-payment/', {
+                'student_id': 'S1', 'semester': 1, 'school_year': 2024, 'amount_paid': '25.00'
+            }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(other.get(url).data['total_money_received'], 125.0)
+        self.assertEqual(client.get(url).data['total_money_received'], 125.0)
+
+    def test_unreachable_replica_falls_back_to_the_primary(self):
+        with mock.patch.object(connections['replica1'], 'ensure_connection', side_effect=OperationalError):
+            self.assertEqual(self.first_name(), 'Primary')
+        # Skipped until REPLICA_RETRY_SECONDS pass
+        self.assertEqual(self.first_name(), 'Primary')
+        db_router._down_until.clear()
+        self.assertEqual(self.first_name(), 'Replica')
+
+# Connection reuse counters: only requests that query count, background opens apart
+class DbStatsTests(TransactionTestCase):
+    def setUp(self):
+        StudentRecord.objects.create(student_id='S1', email='s1@example.com', full_name='Ana Cruz')
+        self.client = api_client(role='student', student_id='S1')
+
+    def delta(self, action):
+        before = db_stats.stats()
+        action()
+        after = db_stats.stats()
+        return {name: after[name] - before[name] for name in after if name not in ('pid', 'reuse_ratio')}
+
+    def get_profile(self):
+        self.client.get('/api/student/profile/')
+
+    def test_counts_reuse_per_request(self):
+        connection.close()
+        self.assertEqual(self.delta(self.get_profile), {
+            'requests': 1, 'requests_with_queries': 1, 'connections_opened': 1,
+            'connections_reused': 0, 'background_connections_opened': 0
+        })
+        self.assertEqual(self.delta(self.get_profile), {
+            'requests': 1, 'requests_with_queries': 1, 'connections_opened': 0,
+            'connections_reused': 1, 'background_connections_opened': 0
+        })
+
+    def test_requests_without_queries_are_not_reuse(self):
+        self.assertEqual(self.delta(lambda: APIClient().get('/api/student/profile/')), {
+            'requests': 1, 'requests_with_queries': 0, 'connections_opened': 0,
+            'connections_reused': 0, 'background_connections_opened': 0
+        })
+
+    def test_background_connections_are_counted_apart(self):
+        def background():
+            self.assertEqual(run_threads(lambda index: StudentRecord.objects.count(), 2), [])
+        self.assertEqual(self.delta(background), {
+            'requests': 0, 'requests_with_queries': 0, 'connections_opened': 0,
+            'connections_reused': 0, 'background_connections_opened': 2
+        })
+
+# One-time codes: single use, expiry and the attempt limit
+@override_settings(OTP_MAX_ATTEMPTS=3)
+class OtpTests(TestCase):
+    def test_valid_code_is_consumed_once(self):
+        code = otp.issue('S1', StudentOtp.VERIFY)
+        self.assertEqual(otp.consume('S1', StudentOtp.RESET, code), otp.MISSING)
+        self.assertEqual(otp.consume('S1', StudentOtp.VERIFY, code), otp.VALID)
+        self.assertEqual(otp.consume('S1', StudentOtp.VERIFY, code), otp.MISSING)
+
+    def test_expired_code_is_rejected_and_removed(self):
+        code = otp.issue('S1', StudentOtp.VERIFY)
+        StudentOtp.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(otp.consume('S1', StudentOtp.VERIFY, code), otp.EXPIRED)
+        self.assertFalse(StudentOtp.objects.exists())
+
+    def test_wrong_codes_lock_the_code(self):
+        code = otp.issue('S1', StudentOtp.RESET)
+        wrong = '000000' if code != '000000' else '111111'
+        self.assertEqual(otp.consume('S1', StudentOtp.RESET, wrong), otp.INVALID)
+        self.assertEqual(otp.consume('S1', StudentOtp.RESET, wrong), otp.INVALID)
+        self.assertEqual(otp.consume('S1', StudentOtp.RESET, wrong), otp.LOCKED)
+        self.assertEqual(otp.consume('S1', StudentOtp.RESET, code), otp.MISSING)
+
+    def test_verify_endpoints_are_throttled(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        body = {'student_id': 'S404', 'otp_code': '123456', 'new_password': 'Secret123!'}
+        statuses = [
+            APIClient().post('/api/student/forgot-password-verify-otp/', body, format='json').status_code
+            for _ in range(4)
+        ]
+        self.assertEqual(statuses, [404, 404, 404, 429])
+
+@override_settings(OTP_MAX_ATTEMPTS=3)
+class OtpConcurrencyTests(TransactionTestCase):
+    def test_parallel_guesses_share_the_attempt_limit(self):
+        code = otp.issue('S1', StudentOtp.RESET)
+        wrong = [f"{number:06d}" for number in range(20) if f"{number:06d}" != code][:12]
+
+        # The code is only hashed and compared once an attempt is reserved
+        with mock.patch.object(otp, 'hash_code', wraps=otp.hash_code) as compared:
+            self.assertEqual(run_threads(lambda index: otp.consume('S1', StudentOtp.RESET, wrong[index]), len(wrong)), [])
+        self.assertEqual(compared.call_count, 3)
+        self.assertEqual(otp.consume('S1', StudentOtp.RESET, code), otp.MISSING)
+
+# Compact format: the ETag covers every rendered field
+class CompactPaymentHistoryTests(TestCase):
+    url = '/api/student/payment-history/'
+    compact = 'application/vnd.feetracker.compact+json'
+
+    def setUp(self):
+        cache.clear()
+        student_payloads.clear()
+        StudentRecord.objects.create(student_id='S1', email='s1@example.com', full_name='Ana Cruz')
+        StudentPaymentHistory.objects.create(receipt_id='CTUG1', student_id='S1', semester='1', school_year='2024', amount_paid=Decimal('100.00'))
+        self.client = api_client(role='student', student_id='S1')
+
+    def test_rename_changes_the_etag(self):
+        first = self.client.get(self.url, HTTP_ACCEPT=self.compact)
+        self.assertEqual(json.loads(first.content)['data']['full_name'], 'Ana Cruz')
+
+        StudentRecord.objects.filter(student_id='S1').update(full_name='Ana Reyes')
+        versions.bump('S1')
+        response = self.client.get(self.url, HTTP_ACCEPT=self.compact, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], first['ETag'])
+        self.assertEqual(json.loads(response.content)['data']['full_name'], 'Ana Reyes')
+
+# Outbox delivery: retries with backoff, then the dead state
+@override_settings(OUTBOX_RETRY_DELAY=30, OUTBOX_MAX_ATTEMPTS=3)
+class OutboxTests(TestCase):
+    def setUp(self):
+        self.email = outbox.queue_mail("OTP", "Code 123456", "s1@example.com")
+
+    def send_failing(self):
+        with mock.patch('app.outbox.EmailMessage.send', side_effect=OSError("relay down")), self.assertLogs('app.outbox', 'WARNING'):
+            return outbox.send_pending()
+
+    def make_due(self):
+        OutboxEmail.objects.update(next_attempt_at=timezone.now())
+
+    def test_delivers_pending_mail(self):
+        self.assertEqual(outbox.send_pending(), 1)
+        self.email.refresh_from_db()
+        self.assertEqual((self.email.status, self.email.attempts), (OutboxEmail.SENT, 1))
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_failures_back_off_then_go_dead(self):
+        for attempt, delay in ((1, 30), (2, 60)):
+            started = timezone.now()
+            self.assertEqual(self.send_failing(), 1)
+            self.email.refresh_from_db()
+            self.assertEqual((self.email.status, self.email.attempts), (OutboxEmail.PENDING, attempt))
+            self.assertAlmostEqual((self.email.next_attempt_at - started).total_seconds(), delay, delta=5)
+            # Not due yet
+            self.assertEqual(outbox.send_pending(), 0)
+            self.make_due()
+
+        self.assertEqual(self.send_failing(), 1)
+        self.email.refresh_from_db()
+        self.assertEqual((self.email.status, self.email.attempts, self.email.last_error), (OutboxEmail.DEAD, 3, "relay down"))
+        self.make_due()
+        self.assertEqual(outbox.send_pending(), 0)
+
+    def test_waiting_retry_schedules_a_drain(self):
+        self.send_failing()
+        with mock.patch('app.outbox.threading.Timer') as timer, mock.patch.multiple(outbox, _retry_timer=None, _retry_at=None):
+            outbox.schedule_retry()
+            outbox.schedule_retry()
+        timer.assert_called_once()
+        delay, callback = timer.call_args.args
+        self.assertAlmostEqual(delay, 30, delta=5)
+        self.assertIs(callback, outbox._retry_due)
+        timer.return_value.start.assert_called_once()
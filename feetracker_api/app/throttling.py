@@ -0,0 +1,95 @@
+import time
+from django.core.cache import cache as default_cache
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+# Sliding-window throttles for the unauthenticated endpoints. Views set
+# throttle_scope; rates come from REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']
+# under "<scope>" (per client IP) and "<scope>_identity" (per submitted
+# student_id / username). Each fixed window has a counter in the default
+# cache, and a request is judged on the current count plus the previous
+# window's count weighted by how much of it still overlaps the last period,
+# so a burst cannot double up across a window boundary. Counters are only
+# changed through add(), incr() and decr(), which are atomic on a shared
+# store, so concurrent requests from any number of workers cannot overshoot.
+# DRF runs throttles before the handler, so a rejected request never
+# reaches the database or the password hasher.
+
+class SlidingWindowThrottle(BaseThrottle):
+    cache = default_cache
+    rate_suffix = ''
+    durations = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+    def __init__(self):
+        self.wait_seconds = None
+
+    def get_rate(self, view):
+        scope = getattr(view, 'throttle_scope', None)
+        if not scope:
+            return None, None
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(scope + self.rate_suffix)
+        if not rate:
+            return scope, None
+        count, period = rate.split('/')
+        return scope, (int(count), self.durations[period[0]])
+
+    def allow_request(self, request, view):
+        scope, rate = self.get_rate(view)
+        if rate is None:
+            return True
+        ident = self.get_ident_value(request, view)
+        if not ident:
+            return True
+
+        limit, period = rate
+        now = time.time()
+        window = int(now // period)
+        key = f"throttle:{scope}{self.rate_suffix}:{ident}"
+        current_key = f"{key}:{window}"
+
+        # Kept for two periods: it is the previous window for the next one
+        if self.cache.add(current_key, 1, period * 2):
+            count = 1
+        else:
+            try:
+                count = self.cache.incr(current_key)
+            except ValueError:
+                # Expired between add() and incr()
+                self.cache.add(current_key, 1, period * 2)
+                count = 1
+
+        previous = self.cache.get(f"{key}:{window - 1}", 0)
+        overlap = (window + 1) * period - now
+        if previous * overlap / period + count <= limit:
+            return True
+
+        # Rejected requests do not use up the limit
+        try:
+            self.cache.decr(current_key)
+        except ValueError:
+            pass
+        count -= 1
+        if previous and count < limit:
+            # The previous window's weight drops until the request fits
+            self.wait_seconds = overlap - (limit - count - 1) * period / previous
+        else:
+            self.wait_seconds = overlap
+        return False
+
+    def wait(self):
+        return self.wait_seconds
+
+class ClientIPThrottle(SlidingWindowThrottle):
+    def get_ident_value(self, request, view):
+        return self.get_ident(request)
+
+class IdentityThrottle(SlidingWindowThrottle):
+    rate_suffix = '_identity'
+
+    def get_ident_value(self, request, view):
+        field = getattr(view, 'throttle_identity_field', 'student_id')
+        try:
+            value = request.data.get(field)
+        except AttributeError:
+            return None
+        return str(value).strip().lower()[:150] if value else None
@@ -19,10 +19,17 @@ from .views import (
     TreasurerDashboardView,
     TreasurerStudentBalanceView,
     TreasurerAddPaymentView,
+    TreasurerBulkAddPaymentView,
     TreasurerDeletePaymentView,
     TreasurerReportView,
+    TreasurerReportCacheStatsView,
+    TreasurerReportJobView,
+    TreasurerReportJobDownloadView,
     AdminLoginView,
     AdminCreateStudentAccountView,
+    AdminBulkCreateStudentAccountsView,
+    AdminStudentCacheStatsView,
+    AdminDbConnectionStatsView,
     AdminCreateTreasurerAccountView,
     AdminCreateAdminAccountView,
     AdminSetNewPasswordView
@@ -48,10 +55,17 @@ urlpatterns = [
     path('treasurer/dashboard/', TreasurerDashboardView.as_view(), name="treasurer-dashboard"),
     path('treasurer/student-balance/', TreasurerStudentBalanceView.as_view(), name='treasurer-view-student-balance'),
     path('treasurer/add-payment/', TreasurerAddPaymentView.as_view(), name="treasurer-add-payment"),
+    path('treasurer/add-payments/bulk/', TreasurerBulkAddPaymentView.as_view(), name="treasurer-bulk-add-payment"),
     path('treasurer/payments/<str:receipt_id>/', TreasurerDeletePaymentView.as_view(), name='treasurer-delete-payment'),
     path('treasurer/report/', TreasurerReportView.as_view(), name='treasurer-report'),
+    path('treasurer/report/cache-stats/', TreasurerReportCacheStatsView.as_view(), name='treasurer-report-cache-stats'),
+    path('treasurer/report/jobs/<uuid:job_id>/', TreasurerReportJobView.as_view(), name='treasurer-report-job'),
+    path('treasurer/report/jobs/<uuid:job_id>/download/', TreasurerReportJobDownloadView.as_view(), name='treasurer-report-job-download'),
     path('admin/login/', AdminLoginView.as_view(), name='admin-login'),
     path('admin/create/student-account/', AdminCreateStudentAccountView.as_view(), name='admin-create-student-account'),
+    path('admin/create/student-accounts/bulk/', AdminBulkCreateStudentAccountsView.as_view(), name='admin-bulk-create-student-accounts'),
+    path('admin/student-cache-stats/', AdminStudentCacheStatsView.as_view(), name='admin-student-cache-stats'),
+    path('admin/db-connection-stats/', AdminDbConnectionStatsView.as_view(), name='admin-db-connection-stats'),
     path('admin/create/treasurer-account/', AdminCreateTreasurerAccountView.as_view(), name='admin-create-treasurer-account'),
     path('admin/create/admin-account/', AdminCreateAdminAccountView.as_view(), name='admin-create-admin-account'),
     path('admin/set-new-password/', AdminSetNewPasswordView.as_view(), name='admin-set-new-password'),
@@ -0,0 +1,30 @@
+from django.db import transaction, IntegrityError
+from django.db.models import F
+from .models import StudentDataVersion
+
+# Per-student version stamp, bumped in the same transaction as any write that
+# changes what the student endpoints return (payments, record, account status).
+
+def get_version(student_id):
+    return StudentDataVersion.objects.filter(student_id=student_id).values_list('version', flat=True).first() or 0
+
+def bump(student_id):
+    if StudentDataVersion.objects.filter(student_id=student_id).update(version=F('version') + 1):
+        return
+
+    try:
+        with transaction.atomic():
+            StudentDataVersion.objects.create(student_id=student_id, version=1)
+    except IntegrityError:
+        StudentDataVersion.objects.filter(student_id=student_id).update(version=F('version') + 1)
+
+def bump_many(student_ids):
+    student_ids = set(student_ids)
+    if not student_ids:
+        return
+
+    StudentDataVersion.objects.bulk_create(
+        [StudentDataVersion(student_id=student_id) for student_id in student_ids],
+        ignore_conflicts=True
+    )
+    StudentDataVersion.objects.filter(student_id__in=student_ids).update(version=F('version') + 1)
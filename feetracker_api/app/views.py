@@ -1,5 +1,4 @@
 import json
-import random
 import hashlib
 import datetime
 from .authentication import IsStudent, IsTreasurer, IsAdmin
@@ -7,21 +6,31 @@ from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.settings import api_settings
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenRefreshView 
 from django.core.validators import validate_email
 from django.core.exceptions import ValidationError
-from django.db.models import Sum, Q, Max, F, FloatField, Case, When, Value
-from django.contrib.auth.hashers import check_password, make_password
-from django.core.mail import send_mail
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Sum, Q
+from django.http import FileResponse
 from django.utils import timezone
 from zoneinfo import ZoneInfo
 from django.utils.timezone import now
-from datetime import timedelta
 from decimal import Decimal
 from .pdf_report import generate_treasurer_report_pdf
-
-from .models import StudentRecord, StudentAccount, StudentPaymentHistory, TreasurerAccount, AdminAccount
+from .receipts import receipt_allocator
+from . import ledger, report_cache, reports, report_jobs, outbox, roster, versions, otp, db_stats
+from .etags import conditional_response
+from .payload_cache import student_payloads
+from .students import load_student, account_of
+from .hashers import verify_password, password_matches, hash_password
+from .throttling import ClientIPThrottle, IdentityThrottle
+from .renderers import CompactJSONRenderer, compact_payload, columns
+from .pagination import InvalidCursor, encode_cursor, decode_cursor, page_size
+
+from .models import StudentRecord, StudentAccount, StudentPaymentHistory, StudentTermBalance, StudentOtp, TreasurerAccount, AdminAccount, ReportJob
 from .serializers import ( 
     StudentLoginSerializer, 
     StudentTokenRefreshSerializer, 
@@ -39,31 +48,15 @@ from .serializers import (
     AdminSetNewPasswordSerializer
 )
 
-# Global variables to track last receipt and deleted IDs
-DELETED_RECEIPTS = set()
-
-# Initialize LAST_RECEIPT_NUMBER from the DB
-def get_last_receipt_number():
-    last_receipt = StudentPaymentHistory.objects.aggregate(
-        max_number=Max('receipt_id')
-    )['max_number']
-
-    if last_receipt and last_receipt.startswith("CTUG"):
-        try:
-            return int(last_receipt[4:])
-        except ValueError:
-            return 100
-    return 100
-
-# Get the last receipt number
-LAST_RECEIPT_NUMBER = get_last_receipt_number()
-
 # Student Refresh View
 class StudentTokenRefreshView(TokenRefreshView):
     serializer_class = StudentTokenRefreshSerializer
 
 # Student Login View
 class StudentLoginView(APIView):
+    throttle_classes = [ClientIPThrottle, IdentityThrottle]
+    throttle_scope = 'login'
+
     def post(self, request):
         serializer = StudentLoginSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -78,7 +71,7 @@ class StudentLoginView(APIView):
         if not account.is_verified:
             return Response({'detail': 'Account not verified'}, status=status.HTTP_403_FORBIDDEN)
 
-        if not check_password(password, account.password):
+        if not verify_password(account, password):
             return Response({'detail': 'Invalid student ID or password'}, status=status.HTTP_401_UNAUTHORIZED)
 
         payload = {
@@ -126,8 +119,6 @@ class StudentRegisterView(APIView):
             return Response({'detail': 'This email is already registered.'}, status=status.HTTP_400_BAD_REQUEST)
 
         full_name = " ".join(filter(None, [first_name, middle_name, last_name]))
-        otp_code = f"{random.randint(100000, 999999)}"
-        otp_expiry = timezone.now() + timedelta(minutes=10)
 
         student_record, _ = StudentRecord.objects.update_or_create(
             student_id=student_id,
@@ -144,13 +135,13 @@ class StudentRegisterView(APIView):
         )
 
         account, _ = StudentAccount.objects.get_or_create(student=student_record)
-        account.password = make_password(password)
-        account.otp_code = otp_code
-        account.otp_expiry = otp_expiry
+        account.password = hash_password(password)
         account.is_verified = False
         account.save()  
+        versions.bump(student_id)
+        otp_code = otp.issue(student_id, StudentOtp.VERIFY)
 
-        send_mail(
+        outbox.queue_mail(
             subject="Your FeeTracker Code",
             message=(
                 f"Hi {full_name},\n\n"
@@ -162,15 +153,16 @@ class StudentRegisterView(APIView):
                 f"Thanks,\n"
                 f"The FeeTracker Team"
             ),
-            from_email="noreply@feetracker.com",
-            recipient_list=[email],
-            fail_silently=False
+            recipient=email
         )
 
         return Response({'detail': 'OTP sent. Complete verification to activate your account.'}, status=status.HTTP_200_OK)
     
 # Check Duplicate Student's Credentials
 class CheckStudentDuplicateView(APIView):
+    throttle_classes = [ClientIPThrottle, IdentityThrottle]
+    throttle_scope = 'duplicate_check'
+
     def post(self, request):
         student_id = request.data.get('student_id')
         email = request.data.get('email')
@@ -206,6 +198,16 @@ class CheckStudentDuplicateView(APIView):
     
 # Student Verify OTP
 class StudentVerifyOtpView(APIView):
+    throttle_classes = [ClientIPThrottle, IdentityThrottle]
+    throttle_scope = 'otp'
+
+    OTP_ERRORS = {
+        otp.MISSING: 'No active OTP. Please request a new one.',
+        otp.EXPIRED: 'OTP code has expired. Please request a new one.',
+        otp.INVALID: 'Invalid OTP code.',
+        otp.LOCKED: 'Too many invalid attempts. Please request a new one.',
+    }
+
     def post(self, request):
         serializer = StudentVerifyOtpSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -213,35 +215,26 @@ class StudentVerifyOtpView(APIView):
         student_id = serializer.validated_data['student_id']
         otp_code = serializer.validated_data['otp_code']
 
-        try:
-            account = StudentAccount.objects.get(student_id=student_id)
-        except StudentAccount.DoesNotExist:
+        # Happy path: one UPDATE and one DELETE for the code, one UPDATE for the account
+        result = otp.consume(student_id, StudentOtp.VERIFY, otp_code)
+        if result == otp.VALID and StudentAccount.objects.filter(student_id=student_id, is_verified=False).update(is_verified=True):
+            versions.bump(student_id)
+            return Response({'detail': 'Account verified successfully.'}, status=status.HTTP_200_OK)
+
+        is_verified = StudentAccount.objects.filter(student_id=student_id).values_list('is_verified', flat=True).first()
+        if is_verified is None:
             return Response({'detail': 'Account not found.'}, status=status.HTTP_404_NOT_FOUND)
 
-        if account.is_verified:
+        if is_verified:
             return Response({'detail': 'Account already verified.'}, status=status.HTTP_400_BAD_REQUEST)
 
-        if not account.otp_code or not account.otp_expiry:
-            return Response({'detail': 'No active OTP. Please request a new one.'}, status=status.HTTP_400_BAD_REQUEST)
-
-        if timezone.now() > account.otp_expiry:
-            account.otp_code = None
-            account.otp_expiry = None
-            account.save()
-            return Response({'detail': 'OTP code has expired. Please request a new one.'}, status=status.HTTP_400_BAD_REQUEST)
-
-        if account.otp_code != otp_code:
-            return Response({'detail': 'Invalid OTP code.'}, status=status.HTTP_400_BAD_REQUEST)
-
-        account.is_verified = True
-        account.otp_code = None
-        account.otp_expiry = None
-        account.save()
-
-        return Response({'detail': 'Account verified successfully.'}, status=status.HTTP_200_OK)
+        return Response({'detail': self.OTP_ERRORS[result]}, status=status.HTTP_400_BAD_REQUEST)
     
 # Student Resend OTP View
 class StudentResendOtpView(APIView):
+    throttle_classes = [ClientIPThrottle, IdentityThrottle]
+    throttle_scope = 'otp'
+
     def post(self, request):
         serializer = StudentResendOtpSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -254,19 +247,12 @@ class StudentResendOtpView(APIView):
         except StudentRecord.DoesNotExist:
             return Response({'detail': 'Student record not found or email mismatch.'}, status=status.HTTP_404_NOT_FOUND)
 
-        try:
-            account = StudentAccount.objects.get(student_id=student_id)
-        except StudentAccount.DoesNotExist:
+        if not StudentAccount.objects.filter(student_id=student_id).exists():
             return Response({'detail': 'Account not found. Please register first.'}, status=status.HTTP_404_NOT_FOUND)
 
-        otp_code = f"{random.randint(100000, 999999)}"
-        otp_expiry = timezone.now() + timedelta(minutes=10)
-
-        account.otp_code = otp_code
-        account.otp_expiry = otp_expiry
-        account.save()
+        otp_code = otp.issue(student_id, StudentOtp.VERIFY)
 
-        send_mail(
+        outbox.queue_mail(
             subject="FeeTracker – New OTP Code",
             message=(
                 f"Hi {student.full_name},\n\n"
@@ -276,15 +262,16 @@ class StudentResendOtpView(APIView):
                 f"If you didn’t request this, you can safely ignore it.\n\n"
                 f"— FeeTracker Team"
             ),
-            from_email="noreply@feetracker.com",
-            recipient_list=[email],
-            fail_silently=False
+            recipient=email
         )
 
         return Response({'detail': 'New OTP sent to your email.'}, status=status.HTTP_200_OK)
     
 # Student Forgot Password Request View
 class StudentForgotPasswordRequestView(APIView):
+    throttle_classes = [ClientIPThrottle, IdentityThrottle]
+    throttle_scope = 'otp'
+
     def post(self, request):
         serializer = StudentForgotPasswordRequestSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -300,19 +287,12 @@ class StudentForgotPasswordRequestView(APIView):
         if student.email != email:
             return Response({'detail': 'This email is not registered to this Student ID.'}, status=status.HTTP_400_BAD_REQUEST)
 
-        try:
-            account = StudentAccount.objects.get(student_id=student_id)
-        except StudentAccount.DoesNotExist:
+        if not StudentAccount.objects.filter(student_id=student_id).exists():
             return Response({'detail': 'Account not found for this student_id.'}, status=status.HTTP_404_NOT_FOUND)
 
-        otp_code = f"{random.randint(100000, 999999)}"
-        otp_expiry = timezone.now() + timedelta(minutes=10)
+        otp_code = otp.issue(student_id, StudentOtp.RESET)
 
-        account.otp_code = otp_code
-        account.otp_expiry = otp_expiry
-        account.save()
-
-        send_mail(
+        outbox.queue_mail(
             subject="Your FeeTracker password reset code",
             message=(
                 f"Hi {student.full_name},\n\n"
@@ -323,15 +303,23 @@ class StudentForgotPasswordRequestView(APIView):
                 f"Thanks,\n"
                 f"The FeeTracker Team"
             ),
-            from_email="noreply@feetracker.com",
-            recipient_list=[email],
-            fail_silently=False
+            recipient=email
         )
 
         return Response({'detail': 'Password reset OTP sent to email.'}, status=status.HTTP_200_OK)
     
 # Student Forgot Password Verify OTP View
 class StudentForgotPasswordVerifyOtpView(APIView):
+    throttle_classes = [ClientIPThrottle, IdentityThrottle]
+    throttle_scope = 'otp'
+
+    OTP_ERRORS = {
+        otp.MISSING: 'No active OTP. Request a new one.',
+        otp.EXPIRED: 'OTP has expired. Request a new one.',
+        otp.INVALID: 'Invalid OTP code.',
+        otp.LOCKED: 'Too many invalid attempts. Request a new one.',
+    }
+
     def post(self, request):
         serializer = StudentForgotPasswordVerifyOtpSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -340,33 +328,21 @@ class StudentForgotPasswordVerifyOtpView(APIView):
         otp_code = serializer.validated_data['otp_code']
         new_password = serializer.validated_data['new_password']
 
-        try:
-            account = StudentAccount.objects.get(student_id=student_id)
-        except StudentAccount.DoesNotExist:
-            return Response({'detail': 'Account not found.'}, status=status.HTTP_404_NOT_FOUND)
-
-        if not account.otp_code or not account.otp_expiry:
-            return Response({'detail': 'No active OTP. Request a new one.'}, status=status.HTTP_400_BAD_REQUEST)
-
-        if timezone.now() > account.otp_expiry:
-            account.otp_code = None
-            account.otp_expiry = None
-            account.save()
-            return Response({'detail': 'OTP has expired. Request a new one.'}, status=status.HTTP_400_BAD_REQUEST)
-
-        if account.otp_code != otp_code:
-            return Response({'detail': 'Invalid OTP code.'}, status=status.HTTP_400_BAD_REQUEST)
+        result = otp.consume(student_id, StudentOtp.RESET, otp_code)
+        if result != otp.VALID:
+            if not StudentAccount.objects.filter(student_id=student_id).exists():
+                return Response({'detail': 'Account not found.'}, status=status.HTTP_404_NOT_FOUND)
+            return Response({'detail': self.OTP_ERRORS[result]}, status=status.HTTP_400_BAD_REQUEST)
 
-        account.password = make_password(new_password)
-        account.otp_code = None
-        account.otp_expiry = None
-        account.save()
+        if not StudentAccount.objects.filter(student_id=student_id).update(password=hash_password(new_password)):
+            return Response({'detail': 'Account not found.'}, status=status.HTTP_404_NOT_FOUND)
 
         return Response({'detail': 'Password has been reset successfully.'}, status=status.HTTP_200_OK)
     
 # Student Profile View
 class StudentProfileView(APIView):
     permission_classes = [IsAuthenticated, IsStudent]
+    replica_reads = True
 
     def get(self, request):
         student_id = request.auth.get("student_id")
@@ -374,19 +350,17 @@ class StudentProfileView(APIView):
         if not student_id:
             return Response({"detail": "Authentication failed."}, status=status.HTTP_401_UNAUTHORIZED)
 
-        try:
-            account = StudentAccount.objects.get(student_id=student_id)
-        except StudentAccount.DoesNotExist:
+        return conditional_response(request, "profile", student_id, lambda: self.build_response(student_id))
+
+    def build_response(self, student_id):
+        student = load_student(student_id, 'full_name', 'email', 'contact_number', 'birthdate', 'address')
+        account = account_of(student)
+        if account is None:
             return Response({"detail": "Account not found."}, status=status.HTTP_404_NOT_FOUND)
 
         if not account.is_verified:
             return Response({"detail": "Account is not verified."}, status=status.HTTP_403_FORBIDDEN)
 
-        try:
-            student = StudentRecord.objects.get(student_id=student_id)
-        except StudentRecord.DoesNotExist:
-            return Response({"detail": "Student record not found."}, status=status.HTTP_404_NOT_FOUND)
-
         if not student.full_name or not student.email:
             return Response({"detail": "Incomplete student profile."}, status=status.HTTP_204_NO_CONTENT)
 
@@ -438,6 +412,7 @@ class EditStudentEmailView(APIView):
 
         student.email = new_email
         student.save()
+        versions.bump(student_id)
 
         return Response({"detail": "Email updated successfully."}, status=status.HTTP_200_OK)
 
@@ -453,6 +428,7 @@ class DeleteStudentAccountView(APIView):
         try:
             student = StudentRecord.objects.get(student_id=student_id)
             student.delete()
+            versions.bump(student_id)
             return Response({"detail": "Student account deleted successfully."}, status=status.HTTP_200_OK)
         except StudentRecord.DoesNotExist:
             return Response({"detail": "Student record not found."}, status=status.HTTP_404_NOT_FOUND)
@@ -477,13 +453,13 @@ class ChangeStudentPasswordView(APIView):
         except StudentAccount.DoesNotExist:
             return Response({"detail": "Student account not found."}, status=status.HTTP_404_NOT_FOUND)
 
-        if not check_password(current_password, student_account.password):
+        if not password_matches(current_password, student_account.password):
             return Response({"detail": "Current password is incorrect."}, status=status.HTTP_400_BAD_REQUEST)
 
         if current_password == new_password:
             return Response({"detail": "New password must be different from the current password."}, status=status.HTTP_400_BAD_REQUEST)
 
-        student_account.password = make_password(new_password)
+        student_account.password = hash_password(new_password)
         student_account.save()
 
         return Response({"detail": "Password updated successfully."}, status=status.HTTP_200_OK)
@@ -491,6 +467,8 @@ class ChangeStudentPasswordView(APIView):
 # Student Dashboard View
 class StudentDashboardView(APIView):
     permission_classes = [IsAuthenticated, IsStudent]
+    renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES + [CompactJSONRenderer]
+    replica_reads = True
 
     FIXED_FEE = Decimal(300)
 
@@ -499,18 +477,27 @@ class StudentDashboardView(APIView):
         if not student_id:
             return Response({"detail": "Authentication failed."}, status=status.HTTP_401_UNAUTHORIZED)
 
-        try:
-            student = StudentRecord.objects.get(student_id=student_id)
-        except StudentRecord.DoesNotExist:
+        return conditional_response(request, "dashboard", student_id, lambda: self.build_response(request, student_id))
+
+    def build_response(self, request, student_id):
+        student = load_student(student_id, 'first_name')
+        if student is None:
             return Response({"detail": "Student record not found."}, status=status.HTTP_404_NOT_FOUND)
 
-        payments = StudentPaymentHistory.objects.filter(student_id=student_id).order_by('-payment_date')
-        total_paid = payments.aggregate(total=Sum('amount_paid'))['total'] or Decimal(0)
+        if request.accepted_renderer.format == CompactJSONRenderer.format:
+            return self.build_compact_response(student)
 
-        summarized_payments = {}
-        for payment in payments:
-            key = (payment.semester, payment.school_year)
-            summarized_payments[key] = summarized_payments.get(key, Decimal(0)) + payment.amount_paid
+        payments = (
+            StudentPaymentHistory.objects.filter(student_id=student_id)
+            .only('semester', 'school_year', 'amount_paid', 'payment_date')
+            .order_by('-payment_date')
+        )
+
+        summarized_payments = {
+            (term.semester, term.school_year): term.total_paid
+            for term in ledger.balances(student_id)
+        }
+        total_paid = sum(summarized_payments.values(), Decimal(0))
 
         all_payments_data = []
         for (semester, school_year), paid in sorted(
@@ -568,37 +555,89 @@ class StudentDashboardView(APIView):
 
         return Response(response_data, status=status.HTTP_200_OK)
 
+    # Raw per-term totals and the five latest payments, newest first
+    def build_compact_response(self, student):
+        terms = ledger.balances(student.student_id).order_by('-school_year', '-semester').values_list('semester', 'school_year', 'total_paid')
+        recent = (
+            StudentPaymentHistory.objects.filter(student_id=student.student_id)
+            .order_by('-payment_date')
+            .values_list('semester', 'school_year', 'amount_paid', 'payment_date')[:5]
+        )
+
+        return Response(compact_payload({
+            "student_id": student.student_id,
+            "first_name": student.first_name,
+            "fee": f"{self.FIXED_FEE:.2f}",
+            "terms": columns(["semester", "school_year", "total_paid"], terms),
+            "recent_payments": columns(["semester", "school_year", "amount_paid", "payment_date"], recent),
+        }), status=status.HTTP_200_OK)
+
 # Student Payment History View
 class StudentPaymentHistoryView(APIView):
     permission_classes = [IsAuthenticated, IsStudent]
+    renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES + [CompactJSONRenderer]
+    replica_reads = True
 
     def get(self, request):
         student_id = request.auth.get("student_id")
-        semester = request.query_params.get("semester")
-        school_year = request.query_params.get("school_year")
 
         if not student_id:
             return Response({"detail": "Authentication failed."}, status=status.HTTP_401_UNAUTHORIZED)
 
+        return conditional_response(request, "payment_history", student_id, lambda: self.build_response(request, student_id))
+
+    COMPACT_COLUMNS = ["receipt_id", "semester", "school_year", "amount_paid", "payment_date", "added_by"]
+
+    def filtered_queryset(self, request, student_id):
+        semester = request.query_params.get("semester")
+        school_year = request.query_params.get("school_year")
+
         filters = {"student_id": student_id}
         if semester in ["1", "2"]:
             filters["semester"] = semester
         if school_year and school_year.isdigit():
             filters["school_year"] = school_year
 
-        queryset = StudentPaymentHistory.objects.filter(**filters).order_by("-payment_date")
-
-        if not queryset.exists():
-            return Response({"payments": [], "data_hash": None}, status=status.HTTP_200_OK)
+        queryset = StudentPaymentHistory.objects.filter(**filters).order_by("-payment_date", "-receipt_id")
 
+        # Keyset pagination on (payment_date, receipt_id), newest first
+        cursor = request.query_params.get("cursor")
+        if cursor:
+            cursor_date, cursor_receipt = decode_cursor(cursor, 2)
+            cursor_date = datetime.datetime.fromisoformat(cursor_date)
+            queryset = queryset.filter(
+                Q(payment_date__lt=cursor_date) | Q(payment_date=cursor_date, receipt_id__lt=cursor_receipt)
+            )
+        return queryset
+
+    def paginate(self, request, queryset, cursor_values):
+        limit = page_size(request)
+        page = list(queryset[:limit + 1])
+        next_cursor = None
+        if len(page) > limit:
+            page = page[:limit]
+            next_cursor = encode_cursor(cursor_values(page[-1]))
+        return page, next_cursor
+
+    def build_response(self, request, student_id):
         try:
-            student = StudentRecord.objects.get(student_id=student_id)
-            full_name = student.full_name
-        except StudentRecord.DoesNotExist:
-            full_name = ""
+            queryset = self.filtered_queryset(request, student_id)
+        except (InvalidCursor, TypeError, ValueError):
+            return Response({"detail": "Invalid cursor."}, status=status.HTTP_400_BAD_REQUEST)
+
+        if request.accepted_renderer.format == CompactJSONRenderer.format:
+            return self.build_compact_response(request, student_id, queryset)
+
+        page, next_cursor = self.paginate(request, queryset, lambda obj: [obj.payment_date.isoformat(), obj.receipt_id])
+
+        if not page:
+            return Response({"payments": [], "data_hash": None, "next_cursor": None}, status=status.HTTP_200_OK)
+
+        student = load_student(student_id, 'full_name')
+        full_name = student.full_name if student else ""
 
         payments = []
-        for obj in queryset:
+        for obj in page:
             semester_str = "1st Semester" if obj.semester == "1" else "2nd Semester"
             try:
                 sy_start = int(obj.school_year)
@@ -635,15 +674,36 @@ class StudentPaymentHistoryView(APIView):
 
         response_data = {"payments": payments}
 
-        # Compute hash
+        # Compute hash (per page)
         response_str = json.dumps(response_data, sort_keys=True)
         data_hash = hashlib.sha256(response_str.encode()).hexdigest()
         response_data["data_hash"] = data_hash
+        response_data["next_cursor"] = next_cursor
 
         return Response(response_data, status=status.HTTP_200_OK)
+
+    def build_compact_response(self, request, student_id, queryset):
+        rows, next_cursor = self.paginate(
+            request,
+            queryset.values_list(*self.COMPACT_COLUMNS),
+            lambda row: [row[4].isoformat(), row[0]]
+        )
+        student = load_student(student_id, 'full_name') if rows else None
+
+        return Response(compact_payload(
+            {
+                "full_name": student.full_name if student else "",
+                "payments": columns(self.COMPACT_COLUMNS, rows)
+            },
+            next_cursor=next_cursor
+        ), status=status.HTTP_200_OK)
     
 # Treasurer Login View
 class TreasurerLoginView(APIView):
+    throttle_classes = [ClientIPThrottle, IdentityThrottle]
+    throttle_scope = 'login'
+    throttle_identity_field = 'username'
+
     def post(self, request):
         serializer = TreasurerLoginSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -657,7 +717,7 @@ class TreasurerLoginView(APIView):
             return Response({'detail': 'Username not found'}, status=status.HTTP_401_UNAUTHORIZED)
 
         # Check password
-        if not check_password(password, account.password):
+        if not verify_password(account, password):
             return Response({'detail': 'Invalid username or password'}, status=status.HTTP_401_UNAUTHORIZED)
 
         # Check if password is temporary
@@ -701,7 +761,7 @@ class TreasurerSetNewPasswordView(APIView):
             return Response({'detail': 'Username not found'}, status=status.HTTP_401_UNAUTHORIZED)
 
         # Update password
-        account.password = make_password(new_password)
+        account.password = hash_password(new_password)
         account.must_change_password = False
         account.save()
 
@@ -770,59 +830,126 @@ class TreasurerDashboardView(APIView):
 # Treasurer Student Balance View
 class TreasurerStudentBalanceView(APIView):
     permission_classes = [IsAuthenticated, IsTreasurer]
+    replica_reads = True
+    TOTAL_FEE = Decimal('300.00')
+
+    # Keyset columns for each ?sort= value; a leading "-" reverses the order
+    SORT_KEYS = {
+        'student_id': ['sid'],
+        'name': ['name', 'sid'],
+        'total_paid': ['paid', 'sid'],
+    }
+    STATUS_FILTERS = {
+        'unpaid': Q(paid__lte=0),
+        'partial': Q(paid__gt=0, paid__lt=TOTAL_FEE),
+        'fully_paid': Q(paid__gte=TOTAL_FEE),
+    }
 
     def get(self, request, format=None):
         student_id = request.query_params.get('student_id')
         semester = request.query_params.get('semester')
         school_year = request.query_params.get('school_year')
 
-        response_list = []
-        TOTAL_FEE = Decimal('300.00')
-
         if student_id:
-            payments_qs = StudentPaymentHistory.objects.filter(student_id=student_id)
-            if semester:
-                payments_qs = payments_qs.filter(semester=semester)
-            if school_year:
-                payments_qs = payments_qs.filter(school_year=school_year)
-
-            total_paid = payments_qs.aggregate(total=Sum('amount_paid'))['total'] or Decimal('0.00')
-            balance = TOTAL_FEE - total_paid
+            total_paid = ledger.get_total_paid(student_id, semester, school_year)
+            balance = self.TOTAL_FEE - total_paid
 
-            response_list.append({
+            return Response({"data": [{
                 "student_id": student_id,
                 "total_paid": f"₱{total_paid:,.2f}",
                 "balance": f"₱{balance:,.2f}"
-            })
+            }]})
+
+        # Without a full term, list the latest term with payments (within the
+        # given semester or school year); the term used is echoed back
+        if not semester or not school_year:
+            term = ledger.latest_term(semester, school_year)
+            if term is None:
+                return Response({"data": [], "next_cursor": None, "semester": semester, "school_year": school_year})
+            semester, school_year = term
+
+        sort = request.query_params.get('sort', 'student_id')
+        descending = sort.startswith('-')
+        keys = self.SORT_KEYS.get(sort.lstrip('-'))
+        if not keys:
+            return Response({"detail": f"Invalid sort. Use one of: {', '.join(self.SORT_KEYS)}."}, status=status.HTTP_400_BAD_REQUEST)
+
+        status_filter = request.query_params.get('status')
+        if status_filter and status_filter not in self.STATUS_FILTERS:
+            return Response({"detail": f"Invalid status. Use one of: {', '.join(self.STATUS_FILTERS)}."}, status=status.HTTP_400_BAD_REQUEST)
+
+        payers, unpaid_students, unpaid_orphans = ledger.term_roster(semester, school_year, request.query_params.get('search', '').strip())
+        if status_filter in ('partial', 'fully_paid'):
+            sources = [payers]
+        elif status_filter == 'unpaid':
+            sources = [unpaid_students, unpaid_orphans]
         else:
-            payments_qs = StudentPaymentHistory.objects.all()
-            if semester:
-                payments_qs = payments_qs.filter(semester=semester)
-            if school_year:
-                payments_qs = payments_qs.filter(school_year=school_year)
-
-            latest_student_ids = (
-                payments_qs.order_by('-receipt_id')
-                .values_list('student_id', flat=True)
-                .distinct()[:20]
-            )
+            sources = [payers, unpaid_students, unpaid_orphans]
+        condition = self.STATUS_FILTERS.get(status_filter, Q())
 
-            if latest_student_ids:
-                payments = payments_qs.filter(student_id__in=latest_student_ids)
-                aggregated = payments.values('student_id').annotate(total_paid=Sum('amount_paid'))
+        cursor = request.query_params.get('cursor')
+        if cursor:
+            try:
+                values = decode_cursor(cursor, len(keys))
+                if keys[0] == 'paid':
+                    values[0] = Decimal(values[0])
+            except (InvalidCursor, ArithmeticError, TypeError):
+                return Response({"detail": "Invalid cursor."}, status=status.HTTP_400_BAD_REQUEST)
+            condition &= self.after_cursor(keys, values, descending)
+
+        ordering = [f"-{key}" if descending else key for key in keys]
+        limit = page_size(request)
+        page = self.merged_page([source.filter(condition) for source in sources], ordering, limit + 1)
+        next_cursor = None
+        if len(page) > limit:
+            page = page[:limit]
+            next_cursor = encode_cursor([str(page[-1][key]) if key == 'paid' else page[-1][key] for key in keys])
 
-                for entry in aggregated:
-                    sid = entry['student_id']
-                    total_paid = entry['total_paid'] or Decimal('0.00')
-                    balance = TOTAL_FEE - total_paid
+        response_list = []
+        for row in page:
+            total_paid = Decimal(row['paid'] or 0)
+            balance = self.TOTAL_FEE - total_paid
+            if total_paid <= 0:
+                payment_status = 'unpaid'
+            elif total_paid < self.TOTAL_FEE:
+                payment_status = 'partial'
+            else:
+                payment_status = 'fully_paid'
 
-                    response_list.append({
-                        "student_id": sid,
-                        "total_paid": f"₱{total_paid:,.2f}",
-                        "balance": f"₱{balance:,.2f}"
-                    })
+            response_list.append({
+                "student_id": row['sid'],
+                "full_name": row['name'],
+                "total_paid": f"₱{total_paid:,.2f}",
+                "balance": f"₱{balance:,.2f}",
+                "status": payment_status
+            })
 
-        return Response({"data": response_list})
+        return Response({"data": response_list, "next_cursor": next_cursor, "semester": semester, "school_year": school_year})
+
+    # First `size` rows across the sources: each is paged on its own indexes,
+    # then the few candidates are ordered together by the database (so the
+    # order follows its collation, as the cursor filter does)
+    def merged_page(self, sources, ordering, size):
+        columns = ('sid', 'name', 'paid')
+        candidates = []
+        for source in sources:
+            rows = list(source.order_by(*ordering).values(*columns)[:size])
+            if rows:
+                candidates.append((source, rows))
+        if len(candidates) < 2:
+            return candidates[0][1] if candidates else []
+
+        parts = [source.filter(sid__in=[row['sid'] for row in rows]).values(*columns) for source, rows in candidates]
+        return list(parts[0].union(*parts[1:], all=True).order_by(*ordering)[:size])
+
+    # Rows strictly after the cursor in (k1, k2, ...) order
+    def after_cursor(self, keys, values, descending):
+        lookup = 'lt' if descending else 'gt'
+        condition = Q()
+        for index, key in enumerate(keys):
+            equal = {keys[i]: values[i] for i in range(index)}
+            condition |= Q(**equal, **{f"{key}__{lookup}": values[index]})
+        return condition
 
 # Treasurer Add Payment View
 class TreasurerAddPaymentView(APIView):
@@ -830,8 +957,6 @@ class TreasurerAddPaymentView(APIView):
     MAX_PAID = Decimal("300.00")
 
     def post(self, request):
-        global LAST_RECEIPT_NUMBER, DELETED_RECEIPTS
-
         serializer = TreasurerAddPaymentSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
@@ -840,40 +965,40 @@ class TreasurerAddPaymentView(APIView):
         school_year = serializer.validated_data['school_year']
         amount_paid = Decimal(serializer.validated_data['amount_paid'])
 
-        if not self.can_add_payment(student_id, semester, school_year, amount_paid):
-            total_paid = StudentPaymentHistory.objects.filter(
-                student_id=student_id,
-                semester=semester,
-                school_year=school_year
-            ).aggregate(total=Sum('amount_paid'))['total'] or Decimal("0.00")
-            balance = self.MAX_PAID - total_paid
-            return Response({"detail": f"Paid amount exceed. Balance: ₱{balance:,.2f}"}, status=400)
-
-        # Generate receipt ID
-        if DELETED_RECEIPTS:
-            # Fill in deleted receipt IDs first
-            receipt_id = DELETED_RECEIPTS.pop()
-            number = int(receipt_id[4:])
-        else:
-            # Increment last receipt number
-            LAST_RECEIPT_NUMBER += 1
-            number = LAST_RECEIPT_NUMBER
-            receipt_id = f"CTUG{number}"
-
         # Extract treasurer from JWT
         token_payload = getattr(request, 'auth', None)
         treasurer_username = token_payload.get('username') if token_payload else 'unknown'
 
-        # Save payment
-        payment = StudentPaymentHistory.objects.create(
-            receipt_id=receipt_id,
-            student_id=student_id,
-            semester=semester,
-            school_year=school_year,
-            amount_paid=amount_paid,
-            payment_date=now(),
-            added_by=treasurer_username
-        )
+        # Generate receipt ID (shared across workers, reuses released IDs). It is
+        # taken before the transaction so its block reservation commits on its own.
+        receipt_id = receipt_allocator.next_receipt_id()
+        recorded = False
+
+        try:
+            # Check the cap and save the payment while holding the student's term row
+            with transaction.atomic():
+                term = ledger.lock_term(student_id, semester, school_year)
+                if not self.can_add_payment(term.total_paid, amount_paid):
+                    balance = self.MAX_PAID - term.total_paid
+                    return Response({"detail": f"Paid amount exceed. Balance: ₱{balance:,.2f}"}, status=400)
+
+                payment = StudentPaymentHistory.objects.create(
+                    receipt_id=receipt_id,
+                    student_id=student_id,
+                    semester=semester,
+                    school_year=school_year,
+                    amount_paid=amount_paid,
+                    payment_date=now(),
+                    added_by=treasurer_username
+                )
+                ledger.apply_payment(student_id, semester, school_year, amount_paid)
+                versions.bump(student_id)
+                transaction.on_commit(lambda: report_cache.invalidate_term(semester, school_year))
+            recorded = True
+        finally:
+            # Rejected or rolled back: the next payment in this process reuses the ID
+            if not recorded:
+                receipt_allocator.give_back(receipt_id)
 
         return Response(
             {
@@ -889,35 +1014,120 @@ class TreasurerAddPaymentView(APIView):
             status=201
         )
 
-    def can_add_payment(self, student_id, semester, school_year, new_amount):
-        total_paid = StudentPaymentHistory.objects.filter(
-            student_id=student_id,
-            semester=semester,
-            school_year=school_year
-        ).aggregate(total=Sum('amount_paid'))['total'] or Decimal("0.00")
+    def can_add_payment(self, total_paid, new_amount):
         return (total_paid + new_amount) <= self.MAX_PAID
 
+# Treasurer Bulk Add Payment View
+class TreasurerBulkAddPaymentView(APIView):
+    permission_classes = [IsAuthenticated, IsTreasurer]
+    MAX_PAID = TreasurerAddPaymentView.MAX_PAID
+    MAX_ROWS = 1000
+
+    def post(self, request):
+        rows = request.data.get('payments') if isinstance(request.data, dict) else request.data
+        if not isinstance(rows, list) or not rows:
+            return Response({"detail": "Provide a non-empty list of payments."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(rows) > self.MAX_ROWS:
+            return Response({"detail": f"At most {self.MAX_ROWS} payments per batch."}, status=status.HTTP_400_BAD_REQUEST)
+
+        results = [None] * len(rows)
+        valid = []
+        for index, row in enumerate(rows):
+            serializer = TreasurerAddPaymentSerializer(data=row)
+            if serializer.is_valid():
+                data = serializer.validated_data
+                key = (data['student_id'], str(data['semester']), str(data['school_year']))
+                valid.append((index, key, Decimal(data['amount_paid'])))
+            else:
+                results[index] = {"row": index, "status": "rejected", "errors": serializer.errors}
+
+        token_payload = getattr(request, 'auth', None)
+        treasurer_username = token_payload.get('username') if token_payload else 'unknown'
+
+        with transaction.atomic():
+            # Running totals for every affected student-term, locked for this batch.
+            # Kept per ledger row: request keys may differ only in case.
+            terms = ledger.lock_terms({key for _, key, _ in valid})
+            locked_rows = {term.pk: term for term in terms.values()}
+            running = {pk: term.total_paid for pk, term in locked_rows.items()}
+
+            accepted = []
+            for index, key, amount_paid in valid:
+                pk = terms[key].pk
+                if running[pk] + amount_paid > self.MAX_PAID:
+                    balance = self.MAX_PAID - running[pk]
+                    results[index] = {"row": index, "status": "rejected", "detail": f"Paid amount exceed. Balance: ₱{balance:,.2f}"}
+                    continue
+                running[pk] += amount_paid
+                accepted.append((index, key, amount_paid))
+
+            receipt_ids = receipt_allocator.reserve_contiguous(len(accepted)) if accepted else []
+            payment_date = now()
+
+            payments = []
+            for (index, (student_id, semester, school_year), amount_paid), receipt_id in zip(accepted, receipt_ids):
+                payments.append(StudentPaymentHistory(
+                    receipt_id=receipt_id,
+                    student_id=student_id,
+                    semester=semester,
+                    school_year=school_year,
+                    amount_paid=amount_paid,
+                    payment_date=payment_date,
+                    added_by=treasurer_username
+                ))
+                results[index] = {"row": index, "status": "accepted", "receipt_id": receipt_id}
+            StudentPaymentHistory.objects.bulk_create(payments)
+
+            # Ledger rows are locked, so their new totals can be written directly
+            for pk, term in locked_rows.items():
+                term.total_paid = running[pk]
+            for _, key, _ in accepted:
+                terms[key].payment_count += 1
+            StudentTermBalance.objects.bulk_update(locked_rows.values(), ['total_paid', 'payment_count'])
+            versions.bump_many(key[0] for _, key, _ in accepted)
+
+            for semester, school_year in {(key[1], key[2]) for _, key, _ in accepted}:
+                transaction.on_commit(lambda semester=semester, school_year=school_year: report_cache.invalidate_term(semester, school_year))
+
+        return Response(
+            {
+                "detail": f"{len(accepted)} payment(s) recorded, {len(rows) - len(accepted)} rejected.",
+                "accepted": len(accepted),
+                "rejected": len(rows) - len(accepted),
+                "payment_date": payment_date,
+                "added_by": treasurer_username,
+                "results": results
+            },
+            status=status.HTTP_201_CREATED if accepted else status.HTTP_400_BAD_REQUEST
+        )
+
 # Treasurer Delete Payment View
 class TreasurerDeletePaymentView(APIView):
     permission_classes = [IsAuthenticated, IsTreasurer]
 
     def delete(self, request, receipt_id, format=None):
-        global DELETED_RECEIPTS
-
         receipt_id = receipt_id.strip()
-        deleted_count, _ = StudentPaymentHistory.objects.filter(receipt_id=receipt_id).delete()
 
-        if deleted_count == 0:
-            return Response({"detail": f"Payment not found: {receipt_id}"}, status=status.HTTP_404_NOT_FOUND)
+        with transaction.atomic():
+            payment = StudentPaymentHistory.objects.select_for_update().filter(receipt_id=receipt_id).first()
+
+            if payment is None:
+                return Response({"detail": f"Payment not found: {receipt_id}"}, status=status.HTTP_404_NOT_FOUND)
 
-        # Track deleted receipt ID for reuse
-        DELETED_RECEIPTS.add(receipt_id)
+            payment.delete()
+            ledger.revert_payment(payment.student_id, payment.semester, payment.school_year, payment.amount_paid)
+            versions.bump(payment.student_id)
+            transaction.on_commit(lambda: report_cache.invalidate_term(payment.semester, payment.school_year))
+
+            # Track deleted receipt ID for reuse
+            receipt_allocator.release(receipt_id)
 
         return Response({"detail": f"Payment {receipt_id} deleted successfully"}, status=status.HTTP_200_OK)
 
 # Treasurer Report View
 class TreasurerReportView(APIView):
     permission_classes = [IsAuthenticated, IsTreasurer]
+    replica_reads = True
     
     def get(self, request):
         start_date_str = request.query_params.get('start_date')
@@ -925,76 +1135,27 @@ class TreasurerReportView(APIView):
         semester = request.query_params.get('semester')
         school_year = request.query_params.get('school_year')
 
-        payments = StudentPaymentHistory.objects.all()
-
-        def parse_date(date_str):
-            if date_str:
-                date_obj = timezone.datetime.fromisoformat(date_str)
-                if timezone.is_naive(date_obj):
-                    date_obj = timezone.make_aware(date_obj)
-                return date_obj
-            return None
-
-        start_date = parse_date(start_date_str)
-        end_date = parse_date(end_date_str)
-
-        if start_date:
-            payments = payments.filter(payment_date__gte=start_date)
-        if end_date:
-            end_date += timedelta(days=1)
-            payments = payments.filter(payment_date__lt=end_date)
-        if semester:
-            payments = payments.filter(semester=semester)
-        if school_year:
-            payments = payments.filter(school_year=school_year)
-
-        FULL_PAYMENT_AMOUNT = 300.00
-        students = payments.values('student_id').annotate(total_paid=Sum('amount_paid'))
-        total_of_students = students.count()
-        total_of_fully_paid_students = students.filter(total_paid__gte=FULL_PAYMENT_AMOUNT).count()
-        total_of_not_fully_paid_students = total_of_students - total_of_fully_paid_students
-
-        total_money_received = students.aggregate(total=Sum('total_paid'))['total'] or 0
-        total_balance_money = students.aggregate(
-            total_balance=Sum(
-                Case(
-                    When(total_paid__lt=FULL_PAYMENT_AMOUNT, then=FULL_PAYMENT_AMOUNT - F('total_paid')),
-                    default=Value(0),
-                    output_field=FloatField()
-                )
+        payments = reports.filter_payments(semester, school_year, start_date_str, end_date_str)
+
+        # Queue the PDF for the report worker instead of rendering it here
+        if request.query_params.get('download') == 'pdf' and request.query_params.get('mode') == 'async':
+            token_payload = getattr(request, 'auth', None)
+            job = report_jobs.enqueue(
+                semester,
+                school_year,
+                start_date_str,
+                end_date_str,
+                requested_by=token_payload.get('username') if token_payload else None
             )
-        )['total_balance'] or 0
-        expected_total_money_received = FULL_PAYMENT_AMOUNT * total_of_students
+            return Response({"job_id": str(job.id), "status": job.status}, status=status.HTTP_202_ACCEPTED)
 
-        fully_paid_percentage = (total_of_fully_paid_students / total_of_students * 100) if total_of_students else 0
-        not_fully_paid_percentage = (total_of_not_fully_paid_students / total_of_students * 100) if total_of_students else 0
+        summary = reports.get_summary(payments, semester, school_year, start_date_str, end_date_str)
 
         # PDF download
         if request.query_params.get('download') == 'pdf':
-            summary_data = [
-                ["Total Money Received", total_money_received],
-                ["Total Balance Money", total_balance_money],
-                ["Expected Total Money Received", expected_total_money_received],
-                ["Total Students", total_of_students],
-                ["Fully Paid Students", total_of_fully_paid_students],
-                ["Not Fully Paid Students", total_of_not_fully_paid_students],
-                ["Fully Paid %", round(fully_paid_percentage, 2)],
-                ["Not Fully Paid %", round(not_fully_paid_percentage, 2)]
-            ]
-
-            payment_data = [["Student ID", "Payment Date", "Amount Paid", "Semester", "Scho ol Year"]]
-            for p in payments.order_by('student_id', 'payment_date'):
-                payment_data.append([
-                    p.student_id, 
-                    p.payment_date.strftime("%Y-%m-%d"),
-                    p.amount_paid, 
-                    p.semester, 
-                    p.school_year
-                ])
-
             return generate_treasurer_report_pdf(
-                summary_data,
-                payment_data,
+                reports.summary_table(summary),
+                reports.payment_rows(payments),
                 semester or "N/A",
                 school_year or "N/A",
                 start_date_str or "N/A",
@@ -1003,18 +1164,67 @@ class TreasurerReportView(APIView):
 
         # Default JSON response
         return Response({
-            "total_money_received": float(total_money_received),
-            "total_balance_money": float(total_balance_money),
-            "expected_total_money_received": float(expected_total_money_received),
-            "total_of_students": total_of_students,
-            "total_of_fully_paid_students": total_of_fully_paid_students,
-            "total_of_not_fully_paid_students": total_of_not_fully_paid_students,
-            "fully_paid_percentage": round(fully_paid_percentage, 2),
-            "not_fully_paid_percentage": round(not_fully_paid_percentage, 2)
+            "total_money_received": float(summary["total_money_received"]),
+            "total_balance_money": float(summary["total_balance_money"]),
+            "expected_total_money_received": float(summary["expected_total_money_received"]),
+            "total_of_students": summary["total_of_students"],
+            "total_of_fully_paid_students": summary["total_of_fully_paid_students"],
+            "total_of_not_fully_paid_students": summary["total_of_not_fully_paid_students"],
+            "fully_paid_percentage": round(summary["fully_paid_percentage"], 2),
+            "not_fully_paid_percentage": round(summary["not_fully_paid_percentage"], 2)
         })
+
+# Treasurer Report Job View
+class TreasurerReportJobView(APIView):
+    permission_classes = [IsAuthenticated, IsTreasurer]
+
+    def get(self, request, job_id):
+        try:
+            job = ReportJob.objects.get(id=job_id)
+        except ReportJob.DoesNotExist:
+            return Response({"detail": "Report job not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        return Response({
+            "job_id": str(job.id),
+            "status": job.status,
+            "created_at": job.created_at,
+            "finished_at": job.finished_at,
+            "error": job.error,
+            "download_url": (
+                request.build_absolute_uri(f"{request.path}download/") if job.status == ReportJob.DONE else None
+            )
+        }, status=status.HTTP_200_OK)
+
+# Treasurer Report Job Download View
+class TreasurerReportJobDownloadView(APIView):
+    permission_classes = [IsAuthenticated, IsTreasurer]
+
+    def get(self, request, job_id):
+        try:
+            job = ReportJob.objects.get(id=job_id)
+        except ReportJob.DoesNotExist:
+            return Response({"detail": "Report job not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        if job.status != ReportJob.DONE or not job.file:
+            return Response({"detail": f"Report is not ready (status: {job.status})."}, status=status.HTTP_409_CONFLICT)
+
+        response = FileResponse(job.file.open('rb'), content_type='application/pdf')
+        response['Content-Disposition'] = f'attachment; filename="{report_jobs.download_filename(job)}"'
+        return response
+
+# Treasurer Report Cache Stats View
+class TreasurerReportCacheStatsView(APIView):
+    permission_classes = [IsAuthenticated, IsTreasurer]
+
+    def get(self, request):
+        return Response(report_cache.stats(), status=status.HTTP_200_OK)
     
 # Admin Login View
 class AdminLoginView(APIView):
+    throttle_classes = [ClientIPThrottle, IdentityThrottle]
+    throttle_scope = 'login'
+    throttle_identity_field = 'username'
+
     def post(self, request):
         serializer = AdminLoginSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -1028,7 +1238,7 @@ class AdminLoginView(APIView):
             return Response({'detail': 'Username not found'}, status=status.HTTP_401_UNAUTHORIZED)
 
         # Check password
-        if not check_password(password, account.password):
+        if not verify_password(account, password):
             return Response({'detail': 'Invalid username or password'}, status=status.HTTP_401_UNAUTHORIZED)
 
         # Check if password is temporary
@@ -1101,14 +1311,66 @@ class AdminCreateStudentAccountView(APIView):
 
         # Create student account, bypass OTP, mark verified
         account, _ = StudentAccount.objects.get_or_create(student=student_record)
-        account.password = make_password(password)
-        account.otp_code = None
-        account.otp_expiry = None
+        account.password = hash_password(password)
         account.is_verified = True
         account.save()
+        versions.bump(student_id)
+        otp.discard(student_id, StudentOtp.VERIFY)
 
         return Response({'detail': 'Student account created and verified by admin.'}, status=status.HTTP_201_CREATED)
     
+# Admin Bulk Create Student Accounts View
+class AdminBulkCreateStudentAccountsView(APIView):
+    permission_classes = [IsAuthenticated, IsAdmin]
+
+    FORMATS = {'text/csv': 'csv', 'application/x-ndjson': 'jsonl', 'application/jsonl': 'jsonl'}
+
+    def post(self, request):
+        content_type = request.content_type.split(';')[0].strip()
+
+        # Raw CSV / JSON lines body, or a multipart upload in "file"
+        if content_type in self.FORMATS:
+            content = request.body
+            fmt = self.FORMATS[content_type]
+        else:
+            upload = request.FILES.get('file')
+            if not upload:
+                return Response({'detail': 'Upload a CSV or JSON lines roster in "file".'}, status=status.HTTP_400_BAD_REQUEST)
+            content = upload.read()
+            fmt = request.data.get('format') or ('csv' if upload.name.lower().endswith('.csv') else 'jsonl')
+
+        try:
+            rows = roster.parse_roster(content, fmt)
+        except (ValueError, UnicodeDecodeError) as e:
+            return Response({'detail': f'Could not read roster: {e}'}, status=status.HTTP_400_BAD_REQUEST)
+
+        max_rows = getattr(settings, 'ROSTER_BULK_MAX_ROWS', 100)
+        if len(rows) > max_rows:
+            return Response(
+                {'detail': f'At most {max_rows} students per upload. Import larger rosters with the import_students command.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        result = roster.import_roster(rows)
+        return Response({
+            'detail': f"{result['created']} created, {result['updated']} updated, {len(result['errors'])} rejected.",
+            **result
+        }, status=status.HTTP_200_OK)
+
+# Admin Student Payload Cache Stats View
+class AdminStudentCacheStatsView(APIView):
+    permission_classes = [IsAuthenticated, IsAdmin]
+
+    def get(self, request):
+        return Response(student_payloads.stats(), status=status.HTTP_200_OK)
+
+# Admin DB Connection Stats View (this worker only)
+class AdminDbConnectionStatsView(APIView):
+    permission_classes = [IsAuthenticated, IsAdmin]
+
+    def get(self, request):
+        return Response(db_stats.stats(), status=status.HTTP_200_OK)
+
 # Admin Create Treasurer Account View
 class AdminCreateTreasurerAccountView(APIView):
     permission_classes = [IsAuthenticated, IsAdmin]
@@ -1134,7 +1396,7 @@ class AdminCreateTreasurerAccountView(APIView):
         treasurer = TreasurerAccount.objects.create(
             username=username,
             email=email,
-            password=make_password(password),
+            password=hash_password(password),
             must_change_password=must_change_password
         )
 
@@ -1162,7 +1424,7 @@ class AdminCreateAdminAccountView(APIView):
         admin_account = AdminAccount.objects.create(
             username=username,
             email=email,
-            password=make_password(password),
+            password=hash_password(password),
             must_change_password=must_change_password
         )
 
@@ -1184,7 +1446,7 @@ class AdminSetNewPasswordView(APIView):
             return Response({'detail': 'Username not found'}, status=status.HTTP_401_UNAUTHORIZED)
 
         # Update password
-        account.password = make_password(new_password)
+        account.password = hash_password(new_password)
         account.must_change_password = False
         account.save()
 
@@ -0,0 +1,65 @@
+"""Per-request JWT authentication cost with and without the verified-token cache.
+
+Calls CustomJWTAuthentication.authenticate on a request carrying a student
+access token, the way every API request does, first with the cache off
+(JWT_VERIFY_CACHE_SIZE=0: full signature check and claim validation each
+time) and then with it on, polling the same --tokens tokens round robin as
+mobile clients do.
+
+    python benchmarks/auth_overhead.py --calls 20000 --tokens 1 100
+"""
+import argparse
+from common import setup, timed, report
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--calls', type=int, default=20000)
+    parser.add_argument('--tokens', type=int, nargs='+', default=[1, 100], help="Distinct tokens polled round robin.")
+    args = parser.parse_args()
+
+    setup()
+    from django.test import RequestFactory
+    from rest_framework.request import Request
+    from rest_framework_simplejwt.tokens import AccessToken
+    from app.authentication import CustomJWTAuthentication, verified_tokens
+
+    authentication = CustomJWTAuthentication()
+    factory = RequestFactory()
+    configured_size = verified_tokens.max_entries
+
+    def requests_for(count):
+        requests = []
+        for number in range(count):
+            token = AccessToken()
+            token['role'] = 'student'
+            token['student_id'] = f"S{number:06d}"
+            requests.append(Request(factory.get('/api/student/dashboard/', HTTP_AUTHORIZATION=f"Bearer {token}")))
+        return requests
+
+    def authenticate_all(requests):
+        for number in range(args.calls):
+            user, token = authentication.authenticate(requests[number % len(requests)])
+        return token
+
+    rows = []
+    for count in args.tokens:
+        requests = requests_for(count)
+
+        verified_tokens.max_entries = 0
+        _, uncached = timed(lambda: authenticate_all(requests))
+
+        verified_tokens.max_entries = configured_size
+        verified_tokens.clear()
+        _, cached = timed(lambda: authenticate_all(requests))
+        hit_ratio = verified_tokens.stats()['hit_ratio']
+
+        rows.append((f"{count} token(s), uncached", f"{uncached / args.calls * 1e6:.1f} us/request"))
+        rows.append((
+            f"{count} token(s), cached",
+            f"{cached / args.calls * 1e6:.1f} us/request, hit ratio {hit_ratio}, {uncached / cached:.0f}x"
+        ))
+
+    report(f"Authentication over {args.calls} calls (cache size {configured_size})", rows)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""Shared setup for the benchmark scripts in this directory.
+
+Run them from the project root, e.g.
+
+    python benchmarks/payment_contention.py --threads 16
+
+By default each run gets a fresh, migrated SQLite file through
+feetracker_api.test_settings. To measure a local MySQL stand-in instead,
+point DJANGO_SETTINGS_MODULE at settings that use it; the scripts migrate
+and write to that database, so never aim them at real data.
+"""
+import os
+import sys
+import time
+import logging
+import tempfile
+import threading
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def setup():
+    sys.path.insert(0, BASE_DIR)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'feetracker_api.test_settings')
+    if os.environ['DJANGO_SETTINGS_MODULE'] == 'feetracker_api.test_settings':
+        path = os.path.join(tempfile.mkdtemp(prefix='feetracker-bench-'), 'bench.sqlite3')
+        os.environ['TEST_SQLITE_PATH'] = path
+
+    import django
+    django.setup()
+
+    from django.core.management import call_command
+    from django.test.utils import setup_test_environment
+    setup_test_environment()
+    # Rejected and failed requests are expected under load
+    logging.getLogger('django.request').setLevel(logging.CRITICAL)
+    call_command('migrate', verbosity=0)
+
+def api_client(**claims):
+    from rest_framework.test import APIClient
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    token = RefreshToken().access_token
+    for name, value in claims.items():
+        token[name] = value
+    client = APIClient()
+    client.raise_request_exception = False
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+    return client
+
+# Runs target(index) in `count` threads and returns the wall time in seconds
+def run_threads(target, count):
+    from django.db import connection
+
+    errors = []
+    def run(index):
+        try:
+            target(index)
+        except Exception as exc:
+            errors.append(exc)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=run, args=(index,)) for index in range(count)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    if errors:
+        raise errors[0]
+    return elapsed
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, max(0, round(pct / 100 * len(values)) - 1))
+    return values[index]
+
+def timed(function, repeat=1):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = function()
+    return result, (time.perf_counter() - started) / repeat
+
+def report(title, rows):
+    print(title)
+    width = max(len(name) for name, _ in rows)
+    for name, value in rows:
+        print(f"  {name:<{width}}  {value}")
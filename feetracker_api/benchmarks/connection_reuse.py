@@ -0,0 +1,70 @@
+"""Request latency with and without persistent database connections.
+
+Sends --requests student dashboard requests straight through Django's
+WSGIHandler (the test client keeps connections open between requests, a
+real worker does not) once with CONN_MAX_AGE=0, so every request connects
+and disconnects, and once with --max-age. Reports p50/p99 latency and the
+worker's reuse counters from app.db_stats for each run. SQLite connects
+in microseconds; point DJANGO_SETTINGS_MODULE at settings for a local
+MySQL to see the handshake cost the setting exists for.
+
+    python benchmarks/connection_reuse.py --requests 2000 --max-age 60
+"""
+import time
+import argparse
+from common import setup, percentile, report
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--max-age', type=int, default=60)
+    args = parser.parse_args()
+
+    setup()
+    from django.db import connection
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.test import RequestFactory
+    from rest_framework_simplejwt.tokens import AccessToken
+    from app import db_stats
+    from app.models import StudentRecord, StudentAccount, StudentPaymentHistory
+    from app.ledger import rebuild
+
+    student = StudentRecord.objects.create(student_id='C00001', email='c1@example.com', first_name='Reuse')
+    StudentAccount.objects.create(student=student, password='!', is_verified=True)
+    StudentPaymentHistory.objects.create(receipt_id='CTUG1', student_id='C00001', semester='1', school_year='2024', amount_paid=100)
+    rebuild()
+
+    token = AccessToken()
+    token['role'] = 'student'
+    token['student_id'] = 'C00001'
+    handler = WSGIHandler()
+    factory = RequestFactory()
+
+    def run(max_age):
+        connection.close()
+        connection.settings_dict['CONN_MAX_AGE'] = max_age
+        before = db_stats.stats()
+        latencies = []
+        for _ in range(args.requests):
+            environ = factory.get('/api/student/dashboard/', HTTP_AUTHORIZATION=f"Bearer {token}").environ
+            started = time.perf_counter()
+            response = handler(environ, lambda status, headers: None)
+            b"".join(response)
+            response.close()
+            latencies.append((time.perf_counter() - started) * 1000)
+            assert response.status_code == 200, response.content
+        after = db_stats.stats()
+        opened = after['connections_opened'] - before['connections_opened']
+        reused = after['connections_reused'] - before['connections_reused']
+        return (
+            f"p50 {percentile(latencies, 50):.2f} ms, p99 {percentile(latencies, 99):.2f} ms, "
+            f"opened {opened}, reused {reused}"
+        )
+
+    report(f"Student dashboard over WSGI, {args.requests} requests ({connection.vendor})", [
+        ("CONN_MAX_AGE=0", run(0)),
+        (f"CONN_MAX_AGE={args.max_age}", run(args.max_age)),
+    ])
+
+if __name__ == '__main__':
+    main()
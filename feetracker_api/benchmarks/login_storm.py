@@ -0,0 +1,99 @@
+"""Dashboard p99 latency while a login storm runs alongside it.
+
+--readers threads poll /api/student/dashboard/ for --seconds in three
+phases: alone, during a storm of --stormers threads logging in back to
+back through the configured hashing pool (HASHING_WORKERS /
+HASHING_MAX_PENDING, excess logins get 503), and during the same storm
+with the pool effectively unbounded. Login throttles are lifted so every
+storm request reaches the hasher; a client that gets 503 waits
+--backoff-ms before trying again.
+
+    python benchmarks/login_storm.py --readers 4 --stormers 30 --seconds 5 --workers 2 --max-pending 4
+"""
+import os
+import time
+import argparse
+import threading
+from collections import Counter
+from common import setup, api_client, run_threads, percentile, report
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--stormers', type=int, default=30)
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--workers', type=int, help="Hashing pool workers (default: HASHING_WORKERS).")
+    parser.add_argument('--max-pending', type=int, help="Hashing pool queue limit (default: HASHING_MAX_PENDING).")
+    parser.add_argument('--backoff-ms', type=float, default=100.0, help="Pause before a storm client retries after a 503.")
+    args = parser.parse_args()
+
+    os.environ['THROTTLE_LOGIN'] = os.environ['THROTTLE_LOGIN_IDENTITY'] = '1000000/s'
+    setup()
+    from django.contrib.auth.hashers import make_password, get_hasher
+    from app import hashers
+    from app.models import StudentRecord, StudentAccount, StudentPaymentHistory
+    from app.ledger import rebuild
+
+    password = 'Secret123!'
+    encoded = make_password(password)
+    for number in range(args.readers + args.stormers):
+        student = StudentRecord.objects.create(student_id=f"D{number:05d}", email=f"d{number}@example.com", first_name='Load')
+        StudentAccount.objects.create(student=student, password=encoded, is_verified=True)
+        StudentPaymentHistory.objects.create(
+            receipt_id=f"CTUG{number}", student_id=student.student_id, semester='1', school_year='2024', amount_paid=100
+        )
+    rebuild()
+
+    bounded = hashers.HashingPool(
+        args.workers or hashers.hashing_pool.workers,
+        args.max_pending if args.max_pending is not None else hashers.hashing_pool.max_pending
+    )
+    unbounded = hashers.HashingPool(args.stormers, args.stormers)
+
+    def phase(pool=None):
+        if pool:
+            hashers.hashing_pool = pool
+        stop = threading.Event()
+        latencies = []
+        logins = Counter()
+
+        def read(index):
+            client = api_client(role='student', student_id=f"D{index:05d}")
+            while not stop.is_set():
+                started = time.perf_counter()
+                response = client.get('/api/student/dashboard/')
+                latencies.append((time.perf_counter() - started) * 1000)
+                assert response.status_code == 200, response.content
+
+        def storm(index):
+            client = api_client()
+            student_id = f"D{args.readers + index:05d}"
+            while not stop.is_set():
+                response = client.post('/api/student/login/', {'student_id': student_id, 'password': password}, format='json')
+                logins[response.status_code] += 1
+                if response.status_code == 503:
+                    time.sleep(args.backoff_ms / 1000)
+
+        def run(index):
+            if index == 0:
+                time.sleep(args.seconds)
+                stop.set()
+            elif index <= args.readers:
+                read(index - 1)
+            else:
+                storm(index - 1 - args.readers)
+
+        run_threads(run, 1 + args.readers + (args.stormers if pool else 0))
+        return (
+            f"p50 {percentile(latencies, 50):.1f} ms, p99 {percentile(latencies, 99):.1f} ms, "
+            f"{len(latencies)} reads; logins 200: {logins[200]}, 503: {logins[503]}"
+        )
+
+    report(f"Dashboard under a login storm ({get_hasher().algorithm}, {args.readers} readers, {args.stormers} stormers)", [
+        ("no storm", phase()),
+        (f"storm, pool {bounded.workers} workers / {bounded.max_pending} pending", phase(bounded)),
+        (f"storm, pool {unbounded.workers} workers / {unbounded.max_pending} pending", phase(unbounded)),
+    ])
+
+if __name__ == '__main__':
+    main()
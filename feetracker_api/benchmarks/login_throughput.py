@@ -0,0 +1,81 @@
+"""Student logins per second under each password hasher policy.
+
+Each policy runs in a fresh child process (the hasher costs are read when
+settings load) with the login throttles lifted. Logs in --logins verified
+students one request at a time, so every hash runs on one core, and
+reports logins/s next to the cost of a first login whose stored hash came
+from the other policy and is rehashed by verify_password().
+
+    PBKDF2_ITERATIONS=1000000 python benchmarks/login_throughput.py --policies pbkdf2 argon2 --logins 20
+"""
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+def run_policy(logins):
+    from common import setup, api_client, timed
+    setup()
+    from django.conf import settings
+    from django.contrib.auth.hashers import make_password, get_hasher
+    from app.models import StudentRecord, StudentAccount
+
+    password = 'Secret123!'
+    preferred = get_hasher().algorithm
+    other = next(algorithm for algorithm in ('argon2', 'pbkdf2_sha256') if algorithm != preferred)
+    hashes = {preferred: make_password(password), other: make_password(password, hasher=other)}
+
+    for number in range(logins + 1):
+        student = StudentRecord.objects.create(student_id=f"L{number:05d}", email=f"l{number}@example.com")
+        StudentAccount.objects.create(student=student, password=hashes[preferred if number else other], is_verified=True)
+
+    client = api_client()
+
+    def login(number):
+        response = client.post('/api/student/login/', {'student_id': f"L{number:05d}", 'password': password}, format='json')
+        assert response.status_code == 200, response.content
+
+    _, upgrade = timed(lambda: login(0))
+    assert StudentAccount.objects.get(student_id='L00000').password.startswith(preferred)
+    _, elapsed = timed(lambda: [login(number) for number in range(1, logins + 1)])
+    print(json.dumps({
+        "policy": settings.PASSWORD_HASHER_POLICY,
+        "algorithm": preferred,
+        "login_ms": elapsed / logins * 1000,
+        "upgrade_from": other,
+        "upgrade_ms": upgrade * 1000,
+    }))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--policies', nargs='+', default=['pbkdf2', 'argon2'])
+    parser.add_argument('--logins', type=int, default=20)
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_policy(args.logins)
+        return
+
+    print(f"{'policy':>8}  {'hasher':>14}  {'ms/login':>9}  {'logins/s/core':>13}  first login, rehashed")
+    for policy in args.policies:
+        env = dict(
+            os.environ,
+            PASSWORD_HASHER_POLICY=policy,
+            THROTTLE_LOGIN='1000000/s',
+            THROTTLE_LOGIN_IDENTITY='1000000/s',
+            HASHING_WORKERS='1'
+        )
+        output = subprocess.run(
+            [sys.executable, __file__, '--child', '--logins', str(args.logins)],
+            env=env, capture_output=True, text=True, check=True
+        )
+        result = json.loads(output.stdout.strip().splitlines()[-1])
+        print(
+            f"{result['policy']:>8}  {result['algorithm']:>14}  {result['login_ms']:>9.1f}  "
+            f"{1000 / result['login_ms']:>13.1f}  {result['upgrade_ms']:.1f} ms from {result['upgrade_from']}"
+        )
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""Outbox throughput with Django's locmem email backend as the SMTP stand-in.
+
+Compares sending N messages inline (one send_mail call, and so one
+connection, per message, as the views used to) with queueing them in the
+outbox and draining it in batches over one connection per batch. A fixed
+delay per connection open and per message (--connect-ms, --send-ms)
+stands in for the relay's round trips; 0 measures the pure overhead.
+
+    python benchmarks/outbox_throughput.py --messages 2000 --connect-ms 20 --send-ms 2 --senders 1 4
+"""
+import time
+import argparse
+from django.conf import settings
+from django.core.mail.backends.locmem import EmailBackend
+from common import setup, run_threads, timed, report
+
+# Opens and closes its "connection" the way the SMTP backend does. Imported
+# by Django from EMAIL_BACKEND, so the delays live in settings.
+class SlowLocmemBackend(EmailBackend):
+    connected = False
+
+    def open(self):
+        if self.connected:
+            return False
+        time.sleep(settings.BENCH_CONNECT_SECONDS)
+        self.connected = True
+        return True
+
+    def close(self):
+        self.connected = False
+
+    def send_messages(self, messages):
+        new_connection = self.open()
+        try:
+            time.sleep(settings.BENCH_SEND_SECONDS * len(messages))
+            return super().send_messages(messages)
+        finally:
+            if new_connection:
+                self.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--messages', type=int, default=1000)
+    parser.add_argument('--batch-size', type=int, default=50)
+    parser.add_argument('--senders', type=int, nargs='+', default=[1, 4], help="Concurrent drain workers to try.")
+    parser.add_argument('--connect-ms', type=float, default=0.0)
+    parser.add_argument('--send-ms', type=float, default=0.0)
+    args = parser.parse_args()
+
+    setup()
+    from django.core import mail
+    from django.db import transaction
+    from app import outbox
+    from app.models import OutboxEmail
+
+    settings.EMAIL_BACKEND = 'outbox_throughput.SlowLocmemBackend'
+    settings.BENCH_CONNECT_SECONDS = args.connect_ms / 1000
+    settings.BENCH_SEND_SECONDS = args.send_ms / 1000
+    settings.OUTBOX_SEND_IN_PROCESS = False
+    rows = []
+
+    def inline():
+        for number in range(args.messages):
+            mail.send_mail("OTP", f"Code {number}", outbox.DEFAULT_FROM_EMAIL, [f"s{number}@example.com"], fail_silently=False)
+
+    def enqueue():
+        OutboxEmail.objects.all().delete()
+        for number in range(args.messages):
+            with transaction.atomic():
+                outbox.queue_mail("OTP", f"Code {number}", f"s{number}@example.com")
+
+    mail.outbox = []
+    _, inline_time = timed(inline)
+    rows.append(("inline send_mail", f"{inline_time:.2f} s, {args.messages / inline_time:,.0f} msg/s"))
+
+    for senders in args.senders:
+        _, enqueue_time = timed(enqueue)
+        mail.outbox = []
+
+        def drain(index):
+            while outbox.send_pending(args.batch_size):
+                pass
+
+        drain_time = run_threads(drain, senders)
+        sent = OutboxEmail.objects.filter(status=OutboxEmail.SENT).count()
+        rows.append(("enqueue (per request)", f"{enqueue_time / args.messages * 1000:.2f} ms"))
+        rows.append((
+            f"outbox drain, {senders} sender(s)",
+            f"{drain_time:.2f} s, {args.messages / drain_time:,.0f} msg/s, "
+            f"sent {sent}/{args.messages}, delivered {len(mail.outbox)}"
+        ))
+
+    report(
+        f"Outbox: {args.messages} messages, batch {args.batch_size}, "
+        f"connect {args.connect_ms} ms, send {args.send_ms} ms",
+        rows
+    )
+
+if __name__ == '__main__':
+    main()
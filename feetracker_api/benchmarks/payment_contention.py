@@ -0,0 +1,82 @@
+"""N treasurers posting payments for the same student at once.
+
+Reports throughput of the add-payment endpoint under contention on one
+student's term row and checks that the 300.00 cap held, that the ledger
+matches payment history and that no receipt ID was issued twice. With
+--rollback-every N, every Nth payment fails after its row is written, so
+the rollback path is exercised under the same load.
+
+    python benchmarks/payment_contention.py --threads 16 --payments 40 --rollback-every 7
+"""
+import time
+import argparse
+import itertools
+import threading
+from decimal import Decimal
+from unittest import mock
+from common import setup, api_client, run_threads, percentile, report
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--payments', type=int, default=25, help="Payments posted by each thread.")
+    parser.add_argument('--amount', default='7.50')
+    parser.add_argument('--rollback-every', type=int, default=0, help="Fail every Nth payment after its insert (0 = never).")
+    args = parser.parse_args()
+
+    setup()
+    from django.db.models import Sum
+    from app import ledger
+    from app.models import StudentPaymentHistory, StudentTermBalance
+    from app.views import TreasurerAddPaymentView
+
+    client = api_client(role='treasurer', username='bench')
+    body = {'student_id': 'BENCH-1', 'semester': 1, 'school_year': 2024, 'amount_paid': args.amount}
+    results = []
+    latencies = []
+    calls = itertools.count(1)
+    record = threading.Lock()
+    apply_payment = ledger.apply_payment
+
+    def failing_apply_payment(*call_args, **call_kwargs):
+        if args.rollback_every and next(calls) % args.rollback_every == 0:
+            raise RuntimeError("benchmark rollback")
+        return apply_payment(*call_args, **call_kwargs)
+
+    def work(index):
+        for _ in range(args.payments):
+            started = time.perf_counter()
+            response = client.post('/api/treasurer/add-payment/', body, format='json')
+            elapsed = time.perf_counter() - started
+            with record:
+                latencies.append(elapsed)
+                results.append((response.status_code, response.data.get('receipt_id') if response.status_code == 201 else None))
+
+    with mock.patch.object(ledger, 'apply_payment', side_effect=failing_apply_payment):
+        elapsed = run_threads(work, args.threads)
+
+    statuses = {code: sum(1 for status, _ in results if status == code) for code in sorted({status for status, _ in results})}
+    receipts = [receipt_id for _, receipt_id in results if receipt_id]
+    history_total = StudentPaymentHistory.objects.aggregate(total=Sum('amount_paid'))['total'] or Decimal('0')
+    ledger_total = StudentTermBalance.objects.filter(student_id='BENCH-1').values_list('total_paid', flat=True).first()
+    cap = TreasurerAddPaymentView.MAX_PAID
+    expected_accepted = min(
+        len(results) - statuses.get(500, 0),
+        int(cap // Decimal(args.amount))
+    )
+
+    report("Concurrent add-payment", [
+        ("threads x payments", f"{args.threads} x {args.payments}"),
+        ("wall time", f"{elapsed:.3f} s"),
+        ("requests/s", f"{len(results) / elapsed:.1f}"),
+        ("latency p50 / p99", f"{percentile(latencies, 50) * 1000:.1f} / {percentile(latencies, 99) * 1000:.1f} ms"),
+        ("responses", ", ".join(f"{code}: {count}" for code, count in statuses.items())),
+        ("paid (history / ledger)", f"{history_total} / {ledger_total}"),
+        ("cap held", history_total <= cap),
+        ("accepted until cap", len(receipts) == expected_accepted),
+        ("ledger matches history", ledger.verify() == []),
+        ("unique receipt IDs", len(receipts) == len(set(receipts))),
+    ])
+
+if __name__ == '__main__':
+    main()
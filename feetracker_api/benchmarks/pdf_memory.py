@@ -0,0 +1,59 @@
+"""Peak RSS of the treasurer report PDF against the number of payment rows.
+
+Each size is rendered in a fresh child process (the report is written to
+a temp file, as the view does) and its peak RSS is reported next to the
+baseline with almost no rows. Growth per row is reportlab keeping every
+finished page until the file is saved; see app/pdf_report.py.
+
+    python benchmarks/pdf_memory.py --rows 100 10000 40000 80000
+"""
+import sys
+import json
+import argparse
+import subprocess
+
+def render(rows):
+    import time
+    import resource
+    import tempfile
+    from decimal import Decimal
+    from common import setup
+    setup()
+    from app.pdf_report import build_treasurer_report_pdf
+
+    payment_rows = ((f"S{number:06d}", "2024-01-01", Decimal("150.00")) for number in range(rows))
+    started = time.perf_counter()
+    with tempfile.TemporaryFile() as output:
+        build_treasurer_report_pdf(output, [["Total Students", rows]], payment_rows, "1", "2024", "N/A", "N/A")
+        size = output.tell()
+    print(json.dumps({
+        "rows": rows,
+        "seconds": time.perf_counter() - started,
+        "bytes": size,
+        "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[100, 10000, 40000, 80000])
+    parser.add_argument('--child', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        render(args.child)
+        return
+
+    print(f"{'rows':>8}  {'peak RSS':>10}  {'vs first':>10}  {'KB/row':>7}  {'PDF size':>9}  {'time':>7}")
+    baseline = None
+    for rows in args.rows:
+        output = subprocess.run([sys.executable, __file__, '--child', str(rows)], capture_output=True, text=True, check=True)
+        result = json.loads(output.stdout.strip().splitlines()[-1])
+        rss = result['max_rss_kb'] / 1024
+        if baseline is None:
+            baseline = (rows, rss)
+        growth = rss - baseline[1]
+        per_row = growth * 1024 / (rows - baseline[0]) if rows > baseline[0] else 0
+        print(f"{rows:>8}  {rss:>8.1f}MB  {growth:>+8.1f}MB  {per_row:>7.2f}  {result['bytes'] / 1024:>7.0f}KB  {result['seconds']:>6.1f}s")
+
+if __name__ == '__main__':
+    main()
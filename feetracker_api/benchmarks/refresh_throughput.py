@@ -0,0 +1,82 @@
+"""Refresh-token rotation throughput as the token blacklist tables grow.
+
+Grows the outstanding token table to each --rows size, with every other
+row blacklisted as rotation leaves it and --expired of them already past
+their expiry, then times --refreshes rotations through the student
+refresh endpoint. Each rotation looks the token up by jti, blacklists it
+and records its successor, so the cost should stay flat as the table
+grows. Finally times prune_tokens over the expired rows.
+
+    python benchmarks/refresh_throughput.py --rows 1000 100000 1000000 --refreshes 500
+"""
+import io
+import uuid
+import argparse
+import datetime
+from common import setup, api_client, timed, report
+
+def grow(target, expired_fraction):
+    from django.db import transaction
+    from django.utils import timezone
+    from rest_framework_simplejwt.token_blacklist.models import OutstandingToken, BlacklistedToken
+
+    now = timezone.now()
+    while (existing := OutstandingToken.objects.count()) < target:
+        batch = min(10000, target - existing)
+        with transaction.atomic():
+            tokens = OutstandingToken.objects.bulk_create([
+                OutstandingToken(
+                    jti=uuid.uuid4().hex,
+                    token='',
+                    created_at=now,
+                    expires_at=now + (
+                        -datetime.timedelta(days=1) if number < batch * expired_fraction else datetime.timedelta(days=1)
+                    )
+                )
+                for number in range(batch)
+            ])
+            BlacklistedToken.objects.bulk_create([BlacklistedToken(token=token) for token in tokens[::2]])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 100000, 500000])
+    parser.add_argument('--refreshes', type=int, default=300)
+    parser.add_argument('--expired', type=float, default=0.5, help="Fraction of seeded rows already expired.")
+    args = parser.parse_args()
+
+    setup()
+    from django.core.management import call_command
+    from rest_framework_simplejwt.tokens import RefreshToken
+    from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+
+    client = api_client()
+    rows = []
+
+    def refresh_all(tokens):
+        for token in tokens:
+            response = client.post('/api/student/token-refresh/', {'refresh': token}, format='json')
+            assert response.status_code == 200, response.content
+
+    for size in sorted(args.rows):
+        _, seeded = timed(lambda: grow(size, args.expired))
+        tokens = []
+        for number in range(args.refreshes):
+            token = RefreshToken()
+            token['student_id'] = f"S{number:06d}"
+            token['role'] = 'student'
+            tokens.append(str(token))
+
+        _, elapsed = timed(lambda: refresh_all(tokens))
+        rows.append((
+            f"{size:,} rows",
+            f"{elapsed / args.refreshes * 1000:.2f} ms/refresh, {args.refreshes / elapsed:,.0f} refreshes/s (seeded in {seeded:.1f} s)"
+        ))
+
+    before = OutstandingToken.objects.count()
+    _, pruned = timed(lambda: call_command('prune_tokens', verbosity=0, stdout=io.StringIO()))
+    rows.append(("prune_tokens", f"{before - OutstandingToken.objects.count():,} expired rows in {pruned:.1f} s"))
+
+    report(f"Refresh rotation, {args.refreshes} refreshes per size", rows)
+
+if __name__ == '__main__':
+    main()
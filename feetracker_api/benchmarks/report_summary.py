@@ -0,0 +1,121 @@
+"""Treasurer report summary: original four-query version vs the single pass.
+
+Seeds synthetic payment rows, then times the eight summary figures
+computed three ways: the original per-figure queries over the grouped
+payments, the single conditional aggregation over the same payments
+(date-range reports) and the single pass over the balance ledger (term
+reports). Prints query count and wall time for each, and checks that all
+three agree.
+
+    python benchmarks/report_summary.py --rows 1000000 --students 20000
+"""
+import random
+import argparse
+import datetime
+from decimal import Decimal
+from common import setup, timed, report
+
+def seed(rows, students):
+    from django.db import connection, transaction
+    from django.utils import timezone
+    from app.models import StudentPaymentHistory
+
+    table = connection.ops.quote_name(StudentPaymentHistory._meta.db_table)
+    sql = (
+        f"INSERT INTO {table} (receipt_id, student_id, semester, school_year, amount_paid, payment_date, added_by) "
+        f"VALUES ({', '.join(['%s'] * 7)})"
+    )
+    start = timezone.now() - datetime.timedelta(days=365)
+    amounts = [connection.ops.adapt_decimalfield_value(Decimal(amount), 8, 2) for amount in ('50.00', '100.00', '150.00')]
+    random.seed(6)
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        batch = []
+        for number in range(rows):
+            batch.append((
+                f"CTUG{1000 + number}",
+                f"S{random.randrange(students):06d}",
+                str(random.randint(1, 2)),
+                str(random.randint(2022, 2024)),
+                random.choice(amounts),
+                connection.ops.adapt_datetimefield_value(start + datetime.timedelta(seconds=number * 30)),
+                'bench'
+            ))
+            if len(batch) == 10000 or number == rows - 1:
+                cursor.executemany(sql, batch)
+                batch = []
+
+# The report's summary as it was computed before the single-pass query
+def original_summary(payments):
+    from django.db.models import Sum, F, Case, When, Value, FloatField
+
+    full_payment_amount = 300.00
+    students = payments.values('student_id').annotate(total_paid=Sum('amount_paid'))
+    total_of_students = students.count()
+    total_of_fully_paid_students = students.filter(total_paid__gte=full_payment_amount).count()
+    total_money_received = students.aggregate(total=Sum('total_paid'))['total'] or 0
+    total_balance_money = students.aggregate(
+        total_balance=Sum(
+            Case(
+                When(total_paid__lt=full_payment_amount, then=full_payment_amount - F('total_paid')),
+                default=Value(0),
+                output_field=FloatField()
+            )
+        )
+    )['total_balance'] or 0
+    return {
+        "total_money_received": total_money_received,
+        "total_balance_money": total_balance_money,
+        "total_of_students": total_of_students,
+        "total_of_fully_paid_students": total_of_fully_paid_students,
+    }
+
+def measure(function, repeat):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    with CaptureQueriesContext(connection) as captured:
+        function()
+    result, seconds = timed(function, repeat)
+    return result, len(captured.captured_queries), seconds
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--students', type=int, default=20000)
+    parser.add_argument('--semester', default='1')
+    parser.add_argument('--school-year', default='2023')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    setup()
+    from app import ledger, reports
+
+    _, seeded = timed(lambda: seed(args.rows, args.students))
+    _, rebuilt = timed(ledger.rebuild)
+    payments = reports.filter_payments(args.semester, args.school_year, None, None)
+
+    original, original_queries, original_time = measure(lambda: original_summary(payments), args.repeat)
+    grouped, grouped_queries, grouped_time = measure(
+        lambda: reports.compute_summary(payments, args.semester, args.school_year, use_ledger=False), args.repeat
+    )
+    ledgered, ledger_queries, ledger_time = measure(
+        lambda: reports.compute_summary(payments, args.semester, args.school_year, use_ledger=True), args.repeat
+    )
+
+    figures = ("total_money_received", "total_balance_money", "total_of_students", "total_of_fully_paid_students")
+    agree = all(
+        Decimal(str(original[name])) == Decimal(str(grouped[name])) == Decimal(str(ledgered[name]))
+        for name in figures
+    )
+
+    report(f"Report summary over {args.rows:,} payments ({args.students:,} students)", [
+        ("seed / ledger rebuild", f"{seeded:.1f} s / {rebuilt:.1f} s"),
+        ("original (per-figure)", f"{original_queries} queries, {original_time * 1000:.1f} ms"),
+        ("single pass, payments", f"{grouped_queries} query, {grouped_time * 1000:.1f} ms"),
+        ("single pass, ledger", f"{ledger_queries} query, {ledger_time * 1000:.1f} ms"),
+        ("figures agree", agree),
+    ])
+
+if __name__ == '__main__':
+    main()
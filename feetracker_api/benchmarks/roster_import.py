@@ -0,0 +1,83 @@
+"""Roster password hashing and bulk import vs the per-row endpoint.
+
+First hashes N passwords with the configured hasher three ways: serially,
+on the shared request-path pool the bulk endpoint uses (HASHING_WORKERS)
+and on the process pool of the import_students command
+(ROSTER_HASH_WORKERS). Then imports the same roster through the bulk
+endpoint and, one student per request, through the per-row endpoint.
+
+    python benchmarks/roster_import.py --students 2000 --hash-sample 200
+"""
+import json
+import argparse
+from common import setup, api_client, timed, report
+
+def roster_rows(count, prefix):
+    return [
+        {
+            'student_id': f"{prefix}{number:05d}",
+            'email': f"{prefix.lower()}{number}@example.com",
+            'first_name': 'Roster',
+            'middle_name': 'Bench',
+            'last_name': f"Student{number}",
+            'contact_number': '09170000000',
+            'birthdate': '2004-01-01',
+            'address': 'Cebu City',
+            'password': f"Secret{number}!"
+        }
+        for number in range(count)
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--students', type=int, default=1000)
+    parser.add_argument('--hash-sample', type=int, default=200, help="Passwords hashed in the hashing comparison.")
+    args = parser.parse_args()
+
+    setup()
+    from django.conf import settings
+    from django.contrib.auth.hashers import make_password, get_hasher
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from app import roster
+    from app.hashers import hashing_pool
+
+    passwords = [f"Secret{number}!" for number in range(args.hash_sample)]
+    _, serial = timed(lambda: [make_password(password) for password in passwords])
+    _, pooled = timed(lambda: roster.hash_passwords(passwords))
+    _, processes = timed(lambda: roster.hash_passwords_in_processes(passwords))
+
+    def per_second(seconds):
+        return f"{seconds:.2f} s, {len(passwords) / seconds:,.0f} hashes/s"
+
+    report(f"Hashing {len(passwords)} passwords with {get_hasher().algorithm}", [
+        ("serial", per_second(serial)),
+        (f"request pool ({hashing_pool.workers} threads)", per_second(pooled)),
+        (f"process pool ({settings.ROSTER_HASH_WORKERS} processes)", per_second(processes)),
+    ])
+
+    # One upload for the whole roster, past the endpoint's usual cap
+    settings.ROSTER_BULK_MAX_ROWS = args.students
+    client = api_client(role='admin', username='bench')
+    bulk_body = "\n".join(json.dumps(row) for row in roster_rows(args.students, 'B'))
+    with CaptureQueriesContext(connection) as bulk_queries:
+        response, bulk = timed(lambda: client.post(
+            '/api/admin/create/student-accounts/bulk/', bulk_body, content_type='application/x-ndjson'
+        ))
+    assert response.status_code == 200 and response.data['created'] == args.students, response.content
+
+    per_row_rows = roster_rows(args.students, 'P')
+    with CaptureQueriesContext(connection) as per_row_queries:
+        responses, per_row = timed(lambda: [
+            client.post('/api/admin/create/student-account/', row, format='json') for row in per_row_rows
+        ])
+    assert all(response.status_code == 201 for response in responses), responses[0].content
+
+    report(f"Importing {args.students} students", [
+        ("bulk endpoint", f"{bulk:.2f} s, {len(bulk_queries.captured_queries)} queries, 1 request"),
+        ("per-row endpoint", f"{per_row:.2f} s, {len(per_row_queries.captured_queries)} queries, {args.students} requests"),
+        ("speed-up", f"{per_row / bulk:.1f}x"),
+    ])
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""Cost of serving a throttled request next to the requests it replaces.
+
+Times --requests student logins through the full middleware stack in
+three states: rejected by the throttle (429), let through for an unknown
+student (one query) and let through with a wrong password (one query and
+a password hash). Also times the throttle check alone against the
+configured cache.
+
+    python benchmarks/throttle_rejection.py --requests 2000
+"""
+import argparse
+from common import setup, timed, report
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--hashed', type=int, default=20, help="Wrong-password logins to time (each runs the hasher).")
+    args = parser.parse_args()
+
+    setup()
+    from unittest import mock
+    from django.core.cache import cache, caches
+    from django.db import connection
+    from django.test import RequestFactory
+    from django.test.utils import CaptureQueriesContext
+    from django.contrib.auth.hashers import make_password
+    from rest_framework.test import APIClient
+    from app.models import StudentRecord, StudentAccount
+    from app.throttling import ClientIPThrottle, IdentityThrottle
+
+    student = StudentRecord.objects.create(student_id='T00001', email='t1@example.com')
+    StudentAccount.objects.create(student=student, password=make_password('Secret123!'), is_verified=True)
+    client = APIClient()
+    client.raise_request_exception = False
+
+    def measure(body, count, expected):
+        def send():
+            for _ in range(count):
+                response = client.post('/api/student/login/', body, format='json')
+                assert response.status_code == expected, (response.status_code, expected)
+        with CaptureQueriesContext(connection) as captured:
+            _, elapsed = timed(send)
+        return f"{elapsed / count * 1e6:,.0f} us/request, {len(captured.captured_queries) / count:g} queries/request"
+
+    rows = []
+    unthrottled = (None, None)
+    with mock.patch.object(ClientIPThrottle, 'get_rate', return_value=unthrottled), \
+            mock.patch.object(IdentityThrottle, 'get_rate', return_value=unthrottled):
+        rows.append(("unknown student (401)", measure({'student_id': 'NOPE', 'password': 'x'}, args.requests, 401)))
+        rows.append(("wrong password (401)", measure({'student_id': 'T00001', 'password': 'x'}, args.hashed, 401)))
+
+    cache.clear()
+    body = {'student_id': 'T00001', 'password': 'x'}
+    while client.post('/api/student/login/', body, format='json').status_code != 429:
+        pass
+    rows.insert(0, ("throttled (429)", measure(body, args.requests, 429)))
+
+    request = RequestFactory().post('/api/student/login/')
+    view = mock.Mock(throttle_scope='login')
+    throttle = ClientIPThrottle()
+    _, check = timed(lambda: [throttle.allow_request(request, view) for _ in range(args.requests)])
+    rows.append(("throttle check alone", f"{check / args.requests * 1e6:,.1f} us"))
+
+    report(f"Student login, {caches['default'].__class__.__name__} counters", rows)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,14 @@
+import os
+import tempfile
+from .test_settings import *
+
+# Test settings with a second SQLite database standing in for a read replica.
+# It is not a mirror, so tests can tell which database a read came from:
+#   python manage.py test --settings=feetracker_api.replica_test_settings app.tests.ReplicaRoutingTests
+
+DATABASES = {**DATABASES, 'replica1': {
+    'ENGINE': 'django.db.backends.sqlite3',
+    'NAME': os.path.join(tempfile.gettempdir(), 'feetracker_replica.sqlite3'),
+    'OPTIONS': {'timeout': 30},
+    'TEST': {'NAME': os.path.join(tempfile.gettempdir(), 'feetracker_replica_test.sqlite3')},
+}}
@@ -1,4 +1,5 @@
 import os
+from importlib.util import find_spec
 from pathlib import Path
 from dotenv import load_dotenv
 from datetime import timedelta
@@ -20,6 +21,23 @@ SIMPLE_JWT = {
     "REFRESH_TOKEN_LIFETIME": timedelta(days=14),
 }
 
+# Verified access tokens kept per process until they expire (0 disables)
+JWT_VERIFY_CACHE_SIZE = int(os.getenv('JWT_VERIFY_CACHE_SIZE', 10000))
+
+# Receipt IDs reserved per worker per database round trip
+RECEIPT_BLOCK_SIZE = int(os.getenv('RECEIPT_BLOCK_SIZE', 20))
+
+# Keyset-paginated list endpoints (?limit=)
+PAGE_SIZE_DEFAULT = int(os.getenv('PAGE_SIZE_DEFAULT', 50))
+PAGE_SIZE_MAX = int(os.getenv('PAGE_SIZE_MAX', 200))
+
+# Processes used to hash passwords in the import_students command (the bulk
+# endpoint hashes on the request-path HASHING_WORKERS pool)
+ROSTER_HASH_WORKERS = int(os.getenv('ROSTER_HASH_WORKERS', 4))
+# Rows per bulk roster upload. The endpoint hashes on the request-path pool
+# that logins share, so a large intake belongs in import_students instead
+ROSTER_BULK_MAX_ROWS = int(os.getenv('ROSTER_BULK_MAX_ROWS', 100))
+
 INSTALLED_APPS = [
     'django.contrib.admin',
     'django.contrib.auth',
@@ -30,6 +48,7 @@ INSTALLED_APPS = [
     'corsheaders',
     'rest_framework',
     'rest_framework_simplejwt',
+    'rest_framework_simplejwt.token_blacklist',
     'app',
 ]
 
@@ -38,6 +57,18 @@ REST_FRAMEWORK = {
         'app.authentication.CustomJWTAuthentication',
     ),
     'EXCEPTION_HANDLER': 'app.exceptions.custom_exception_handler',
+    # Sliding windows (app.throttling): "<scope>" is per client IP,
+    # "<scope>_identity" per submitted student_id / username
+    'DEFAULT_THROTTLE_RATES': {
+        'login': os.getenv('THROTTLE_LOGIN', '20/min'),
+        'login_identity': os.getenv('THROTTLE_LOGIN_IDENTITY', '5/min'),
+        'otp': os.getenv('THROTTLE_OTP', '10/hour'),
+        'otp_identity': os.getenv('THROTTLE_OTP_IDENTITY', '3/hour'),
+        'duplicate_check': os.getenv('THROTTLE_DUPLICATE_CHECK', '30/min'),
+        'duplicate_check_identity': os.getenv('THROTTLE_DUPLICATE_CHECK_IDENTITY', '10/min'),
+    },
+    # Forwarded hops to trust for the client IP (set when behind a proxy)
+    'NUM_PROXIES': int(os.environ['NUM_PROXIES']) if os.getenv('NUM_PROXIES') else None,
 }
 
 MIDDLEWARE = [
@@ -49,6 +80,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'app.middleware.ReplicaRoutingMiddleware',
 ]
 
 ROOT_URLCONF = 'feetracker_api.urls'
@@ -81,12 +113,53 @@ DATABASES = {
         'PASSWORD': os.getenv('DB_PASSWORD'),
         'HOST': os.getenv('DB_HOST'),
         'PORT': os.getenv('DB_PORT'),
+        # Keep connections open between requests (seconds; "none" = no limit,
+        # 0 = close after each request) and ping a reused one before use
+        'CONN_MAX_AGE': None if os.getenv('DB_CONN_MAX_AGE', '').lower() == 'none' else int(os.getenv('DB_CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': os.getenv('DB_CONN_HEALTH_CHECKS', 'True') == 'True',
         'OPTIONS': {
             'init_command': "SET sql_mode='STRICT_TRANS_TABLES'",
         },
     }
 }
 
+# Read replicas: comma-separated hosts sharing the primary's credentials. Each
+# becomes a "replicaN" alias used for GETs on views with replica_reads = True.
+for index, host in enumerate(filter(None, os.getenv('DB_REPLICA_HOSTS', '').split(',')), start=1):
+    DATABASES[f'replica{index}'] = {**DATABASES['default'], 'HOST': host.strip(), 'TEST': {'MIRROR': 'default'}}
+
+DATABASE_ROUTERS = ['app.db_router.ReplicaRouter']
+# Seconds a client reads from the primary after a write, and seconds an
+# unreachable replica is skipped
+REPLICA_PIN_SECONDS = int(os.getenv('REPLICA_PIN_SECONDS', 10))
+REPLICA_RETRY_SECONDS = int(os.getenv('REPLICA_RETRY_SECONDS', 30))
+
+# Use a shared backend (e.g. Redis/Memcached) in production so throttles,
+# report caches and ETag stamps hold across workers
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'feetracker'),
+    }
+}
+
+# Seconds a cached treasurer report summary stays valid
+REPORT_CACHE_TIMEOUT = int(os.getenv('REPORT_CACHE_TIMEOUT', 300))
+
+# Seconds the last data_hash per student view/version is remembered for If-None-Match
+ETAG_CACHE_TIMEOUT = int(os.getenv('ETAG_CACHE_TIMEOUT', 3600))
+
+# Student payloads kept per worker process (LRU)
+STUDENT_PAYLOAD_CACHE_SIZE = int(os.getenv('STUDENT_PAYLOAD_CACHE_SIZE', 2000))
+
+# Background PDF reports: identical requests within the TTL share one job.
+# Jobs running longer than REPORT_JOB_RUN_TIMEOUT seconds are treated as
+# abandoned and claimed again.
+# Set REPORT_JOBS_IN_PROCESS=False when running the process_report_jobs worker.
+REPORT_JOB_TTL = int(os.getenv('REPORT_JOB_TTL', 600))
+REPORT_JOB_RUN_TIMEOUT = int(os.getenv('REPORT_JOB_RUN_TIMEOUT', 900))
+REPORT_JOBS_IN_PROCESS = os.getenv('REPORT_JOBS_IN_PROCESS', 'True') == 'True'
+
 EMAIL_BACKEND = os.getenv('EMAIL_BACKEND')
 EMAIL_HOST = os.getenv('EMAIL_HOST')
 EMAIL_PORT = int(os.getenv('EMAIL_PORT'))
@@ -94,6 +167,44 @@ EMAIL_USE_TLS = os.getenv('EMAIL_USE_TLS') == 'True'
 EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD')
 
+# Outbox sender: batch size, retry backoff (doubles per attempt) and dead-letter threshold.
+# Set OUTBOX_SEND_IN_PROCESS=False when running the send_outbox worker.
+OUTBOX_SEND_IN_PROCESS = os.getenv('OUTBOX_SEND_IN_PROCESS', 'True') == 'True'
+OUTBOX_BATCH_SIZE = int(os.getenv('OUTBOX_BATCH_SIZE', 50))
+OUTBOX_RETRY_DELAY = int(os.getenv('OUTBOX_RETRY_DELAY', 30))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv('OUTBOX_MAX_ATTEMPTS', 5))
+
+# Password hashing policy: "argon2" (needs argon2-cffi) or "pbkdf2". Hashes from
+# any hasher listed below still verify and are upgraded to the preferred one
+# on the next successful login.
+PASSWORD_HASHER_POLICY = os.getenv('PASSWORD_HASHER_POLICY', 'argon2' if find_spec('argon2') else 'pbkdf2')
+ARGON2_TIME_COST = int(os.getenv('ARGON2_TIME_COST', 2))
+ARGON2_MEMORY_COST = int(os.getenv('ARGON2_MEMORY_COST', 19456))
+ARGON2_PARALLELISM = int(os.getenv('ARGON2_PARALLELISM', 1))
+PBKDF2_ITERATIONS = int(os.getenv('PBKDF2_ITERATIONS', 1000000))
+
+PASSWORD_HASHERS = [
+    'app.hashers.TunedArgon2PasswordHasher',
+    'app.hashers.TunedPBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+if PASSWORD_HASHER_POLICY == 'pbkdf2':
+    PASSWORD_HASHERS.insert(0, PASSWORD_HASHERS.pop(1))
+
+# One-time codes (verification / password reset); swept by sweep_otps
+OTP_TTL_MINUTES = int(os.getenv('OTP_TTL_MINUTES', 10))
+OTP_MAX_ATTEMPTS = int(os.getenv('OTP_MAX_ATTEMPTS', 5))
+
+# Request-path hashing pool: worker threads and how many calls may wait for
+# one before further requests get 503. Hashing is CPU-bound, so the default
+# of half the CPUs leaves the other half to the rest of the API during a login
+# storm (benchmarks/login_storm.py: with as many workers as cores the
+# dashboard p99 climbs by an order of magnitude).
+HASHING_WORKERS = int(os.getenv('HASHING_WORKERS', max(1, (os.cpu_count() or 2) // 2)))
+HASHING_MAX_PENDING = int(os.getenv('HASHING_MAX_PENDING', 32))
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -0,0 +1,27 @@
+import os
+import tempfile
+from .settings import *
+
+# SQLite settings for the test suite and the scripts in benchmarks/:
+#   python manage.py test --settings=feetracker_api.test_settings
+
+SECRET_KEY = SECRET_KEY or 'feetracker-test-secret-key'
+
+# File databases (not :memory:) so threads get their own connections, and
+# IMMEDIATE transactions so concurrent writers queue instead of failing
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.getenv('TEST_SQLITE_PATH', os.path.join(tempfile.gettempdir(), 'feetracker.sqlite3')),
+        'OPTIONS': {'timeout': 30, 'transaction_mode': 'IMMEDIATE'},
+        'TEST': {'NAME': os.path.join(tempfile.gettempdir(), 'feetracker_test.sqlite3')},
+    }
+}
+
+CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'feetracker-test'}}
+EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+MEDIA_ROOT = os.path.join(tempfile.gettempdir(), 'feetracker_media')
+
+# Background work runs only when a test asks for it
+OUTBOX_SEND_IN_PROCESS = False
+REPORT_JOBS_IN_PROCESS = False